@@ -0,0 +1,120 @@
+"""
+HTTP query service for bars and indicators on aiohttp (same endpoints as api/server.py)
+
+The event loop only accepts connections and moves bytes; loading, computing
+and encoding frames runs in a bounded thread or process pool, so thousands
+of open connections need neither thousands of threads nor block each other.
+
+    python main.py --mode serve --async --workers 4 --executor process
+"""
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from aiohttp import web
+
+from api.batch import NDJSON_TYPE, parse_batch, batch_group_lines
+from api.encoding import JSON_TYPE
+from api.service import IndicatorService, handle_request
+from cache.manager import CacheManager
+
+logger = logging.getLogger(__name__)
+
+# Service of this process: the event loop process for thread pools, each
+# worker process for process pools
+_service = None
+
+def _init_worker(data_dir: str, cache_options: dict) -> None:
+    """Create the process-wide service (ProcessPoolExecutor initializer)"""
+    global _service
+    _service = IndicatorService(data_dir, CacheManager(**cache_options))
+
+def _handle(kind: str, path_args: tuple, query: dict, headers: dict) -> tuple:
+    """Run one request in the pool and return (status, headers, body)"""
+    return handle_request(_service, kind, path_args, query, headers)
+
+def _batch_group(group: dict) -> bytes:
+    """Evaluate one batch group in the pool and return its NDJSON lines"""
+    return b''.join(batch_group_lines(_service, group))
+
+def _cache_stats() -> dict:
+    return dict(_service.cache.stats)
+
+def create_async_app(data_dir: str = './output', cache_mb: int = 256, cache_dir: str = None, redis_url: str = None,
+                     redis_ttl: int = None, workers: int = 4, executor: str = 'thread') -> web.Application:
+    """
+    Build the aiohttp application.
+
+    Args:
+        data_dir: Directory containing stock data files
+        cache_mb: In-process frame cache budget in megabytes (per process)
+        cache_dir: Optional disk cache directory
+        redis_url: Optional Redis URL shared by every process (fakeredis:// for in-process)
+        redis_ttl: Expiry of Redis entries in seconds
+        workers: Size of the compute pool
+        executor: 'thread' (one shared cache, work that releases the GIL runs
+            in parallel) or 'process' (one cache per worker, no GIL contention)
+    """
+    cache_options = {'memory_bytes': cache_mb * 1024 * 1024, 'disk_dir': cache_dir,
+                     'redis_url': redis_url, 'redis_ttl': redis_ttl}
+    if executor == 'process':
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_dir, cache_options))
+    elif executor == 'thread':
+        _init_worker(data_dir, cache_options)
+        pool = ThreadPoolExecutor(max_workers=workers)
+    else:
+        raise ValueError(f"Unknown executor '{executor}', choose from: thread, process")
+
+    async def run(function, *args):
+        return await asyncio.get_running_loop().run_in_executor(pool, function, *args)
+
+    async def respond(request, kind, *path_args):
+        headers = {name.lower(): value for name, value in request.headers.items()}
+        status, headers, body = await run(_handle, kind, path_args, dict(request.query), headers)
+        return web.Response(status=status, headers=headers, body=body)
+
+    async def health(request):
+        stats = await run(_cache_stats)
+        return web.Response(body=json.dumps({'status': 'ok', 'cache': stats}).encode('utf-8'),
+                            headers={'Content-Type': JSON_TYPE})
+
+    async def bars(request):
+        info = request.match_info
+        return await respond(request, 'bars', info['symbol'], info['level'])
+
+    async def indicators(request):
+        info = request.match_info
+        return await respond(request, 'indicators', info['name'], info['symbol'], info['level'])
+
+    async def batch(request):
+        try:
+            lines, groups = parse_batch(await request.read())
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        response = web.StreamResponse(headers={'Content-Type': NDJSON_TYPE})
+        await response.prepare(request)
+        await response.write(b''.join(lines))
+        # Groups run concurrently in the pool and are written as each finishes
+        for done in asyncio.as_completed([run(_batch_group, group) for group in groups]):
+            await response.write(await done)
+        await response.write_eof()
+        return response
+
+    async def shutdown_pool(app):
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    app = web.Application()
+    app.add_routes([
+        web.get('/health', health),
+        web.get('/bars/{symbol}/{level}', bars),
+        web.get('/indicators/{name}/{symbol}/{level}', indicators),
+        web.post('/indicators/batch', batch)
+    ])
+    app.on_cleanup.append(shutdown_pool)
+    return app
+
+def run_async_server(host: str = '127.0.0.1', port: int = 8000, **options) -> None:
+    """Serve the API on an asyncio event loop (see create_async_app for options)"""
+    app = create_async_app(**options)
+    logger.info(f"Serving async API on http://{host}:{port}")
+    web.run_app(app, host=host, port=port, print=None)
@@ -0,0 +1,203 @@
+"""
+Batch indicator queries: many (symbol, level, indicator, params) items in one request
+
+    POST /indicators/batch
+    {"items": [{"symbol": "AAPL", "level": "1_minute", "indicator": "rsi", "params": {"period": 14},
+                "start": "2025-07-29", "end": null}, ...]}
+
+Items may also be given as [symbol, level, indicator, params] lists. Items
+sharing (level, indicator, params) form a group: cached frames are looked up
+with one get_many call and the rest are calculated together through the
+indicator's panel function. Results are streamed back as NDJSON, one line
+per item as its group completes:
+
+    {"index": 0, "symbol": "AAPL", ..., "status": 200, "data": {<orient='split' JSON>}}
+    {"index": 1, "symbol": "XYZ", ..., "status": 404, "error": "..."}
+"""
+import json
+import logging
+import numpy as np
+import pandas as pd
+
+from api.encoding import encode_json
+from api.service import SYMBOL_PATTERN, LEVEL_PATTERN, parse_timestamp, slice_frame
+from cache.manager import params_token
+from indicators import get_indicator
+
+logger = logging.getLogger(__name__)
+
+NDJSON_TYPE = 'application/x-ndjson'
+
+# Upper bound on items per request, so one request cannot tie up a worker indefinitely
+MAX_BATCH_ITEMS = 1000
+
+ITEM_FIELDS = ('symbol', 'level', 'indicator', 'params')
+
+def _line(meta: dict, data: bytes = None) -> bytes:
+    """One NDJSON line; data is spliced in already encoded"""
+    head = json.dumps(meta, default=str)
+    if data is None:
+        return head.encode('utf-8') + b'\n'
+    return head[:-1].encode('utf-8') + b', "data": ' + data + b'}\n'
+
+def _error_line(meta: dict, status: int, message: str) -> bytes:
+    return _line(dict(meta, status=status, error=message))
+
+def _parse_item(index: int, raw) -> dict:
+    """Validate one batch item and resolve its params (raises ValueError)"""
+    if isinstance(raw, (list, tuple)):
+        if not 3 <= len(raw) <= 4:
+            raise ValueError("List items must be [symbol, level, indicator] or [symbol, level, indicator, params]")
+        raw = dict(zip(ITEM_FIELDS, raw))
+    if not isinstance(raw, dict):
+        raise ValueError("Items must be objects or lists")
+    item = {'index': index}
+    for field in ('symbol', 'level', 'indicator'):
+        value = raw.get(field)
+        if not isinstance(value, str):
+            raise ValueError(f"Missing or invalid '{field}'")
+        item[field] = value
+    if not SYMBOL_PATTERN.match(item['symbol']):
+        raise ValueError(f"Invalid symbol '{item['symbol']}'")
+    if not LEVEL_PATTERN.match(item['level']):
+        raise ValueError(f"Invalid time level '{item['level']}'")
+    params = raw.get('params') or {}
+    if not isinstance(params, dict):
+        raise ValueError("'params' must be an object")
+    # Convert through str so JSON numbers get the same type checks as query strings
+    item['params'] = get_indicator(item['indicator']).resolve_params({key: str(value) for key, value in params.items()})
+    # Parsed here so malformed or unusable ranges are rejected before streaming starts
+    for field in ('start', 'end'):
+        item[field] = parse_timestamp(raw.get(field))
+    return item
+
+def parse_batch(body: bytes) -> tuple:
+    """
+    Parse a batch request body into per-item error lines and evaluation groups.
+
+    Returns:
+        (lines, groups): NDJSON lines for items that failed validation, and
+        groups as plain dicts {'level', 'indicator', 'params', 'items'}
+        (picklable, so they can be evaluated in worker processes)
+
+    Raises:
+        ValueError: If the body as a whole is malformed
+    """
+    try:
+        payload = json.loads(body or b'null')
+    except ValueError:
+        raise ValueError("Request body must be JSON")
+    items = payload.get('items') if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON list of items or an object with an 'items' list")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f"Too many items ({len(items)}), at most {MAX_BATCH_ITEMS} per request")
+
+    lines, groups = [], {}
+    for index, raw in enumerate(items):
+        try:
+            item = _parse_item(index, raw)
+        except ValueError as e:
+            lines.append(_error_line({'index': index}, 400, str(e)))
+            continue
+        group_key = (item['level'], item['indicator'], params_token(item['params']))
+        group = groups.setdefault(group_key, {'level': item['level'], 'indicator': item['indicator'],
+                                              'params': item['params'], 'items': []})
+        group['items'].append(item)
+    return lines, list(groups.values())
+
+def _calculate_panel(service, spec, params: dict, sources: dict) -> dict:
+    """
+    Calculate one indicator for several symbols with the panel function.
+
+    Args:
+        sources: Symbol -> bar file path
+
+    Returns:
+        Symbol -> indicator frame, equal to what spec.compute returns per symbol
+    """
+    column = spec.inputs[0]
+    series = {symbol: service.cache.read_bars(path, spec.inputs)[column] for symbol, path in sources.items()}
+    # Only symbols with identical timestamps share a panel: aligning different
+    # calendars would insert NaN gaps that change the recursive indicators
+    calendars = []
+    for symbol, values in series.items():
+        for index, members in calendars:
+            if index.equals(values.index):
+                members.append(symbol)
+                break
+        else:
+            calendars.append((values.index, [symbol]))
+
+    frames = {}
+    for index, members in calendars:
+        # Array input makes the panel functions return {field: 2-D array}
+        wide = np.column_stack([series[symbol].to_numpy(dtype='float64') for symbol in members])
+        result = spec.panel(wide, **params)
+        for j, symbol in enumerate(members):
+            frames[symbol] = pd.DataFrame({field: result[field][:, j] for field in spec.outputs}, index=index)
+    return frames
+
+def batch_group_lines(service, group: dict):
+    """
+    Evaluate one group and yield an NDJSON line per item.
+
+    Cached frames are answered first; missing ones are then calculated in one
+    panel call (or per symbol for indicators without a panel function) and
+    stored back in the cache with one put_many. A failure affecting some
+    items becomes their error line; nothing escapes into the stream.
+    """
+    name, level, params = group['indicator'], group['level'], group['params']
+    spec = get_indicator(name)
+    cache = service.cache
+
+    keys, paths, pending = {}, {}, []
+    for item in group['items']:
+        meta = {field: item[field] for field in ('index', 'symbol', 'level', 'indicator', 'params')}
+        try:
+            if item['symbol'] not in keys:
+                key, path, _ = cache.indicator_key(name, item['symbol'], level, service.data_dir, params)
+                keys[item['symbol']], paths[item['symbol']] = key, path
+        except Exception as e:
+            logger.error(f"Error looking up {name} for {item['symbol']} {level}: {str(e)}")
+            yield _error_line(meta, 500, f"Error looking up {name}")
+            continue
+        if keys[item['symbol']] is None:
+            yield _error_line(meta, 404, 'No data for this symbol and time level')
+        else:
+            pending.append((meta, item))
+
+    found = cache.get_many([keys[item['symbol']] for _, item in pending])
+
+    def answer(meta, item, frame):
+        try:
+            data = encode_json(slice_frame(frame, item['start'], item['end']))
+        except Exception as e:
+            logger.error(f"Error encoding {name} for {item['symbol']} {level}: {str(e)}")
+            return _error_line(meta, 500, f"Error encoding {name}")
+        return _line(dict(meta, status=200), data)
+
+    missing = []
+    for meta, item in pending:
+        frame = found.get(keys[item['symbol']])
+        if frame is not None:
+            yield answer(meta, item, frame)
+        else:
+            missing.append((meta, item))
+    if not missing:
+        return
+
+    sources = {item['symbol']: paths[item['symbol']] for _, item in missing}
+    try:
+        if spec.panel is not None and len(spec.inputs) == 1:
+            frames = _calculate_panel(service, spec, params, sources)
+        else:
+            frames = {symbol: spec.compute(cache.read_bars(path, spec.inputs), params) for symbol, path in sources.items()}
+    except Exception as e:
+        logger.error(f"Error calculating {name} for {len(sources)} symbols at {level}: {str(e)}")
+        for meta, _ in missing:
+            yield _error_line(meta, 500, f"Error calculating {name}")
+        return
+    cache.put_many({keys[symbol]: frame for symbol, frame in frames.items()})
+    for meta, item in missing:
+        yield answer(meta, item, frames[item['symbol']])
@@ -0,0 +1,122 @@
+"""Response encodings for API frames: JSON, Arrow IPC stream and NumPy .npy, chosen by content negotiation"""
+import io
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional here; Arrow is then not offered
+    pa = None
+
+JSON_TYPE = 'application/json'
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+NPY_TYPE = 'application/x-npy'
+
+# ?format= shortcuts for clients that cannot set an Accept header
+FORMAT_TYPES = {
+    'json': JSON_TYPE,
+    'arrow': ARROW_TYPE,
+    'npy': NPY_TYPE
+}
+
+# Name of the timestamp field in the binary encodings
+INDEX_FIELD = 'timestamp'
+
+def encode_json(df: pd.DataFrame) -> bytes:
+    """
+    Encode a timestamp-indexed frame as columnar JSON.
+
+    Uses pandas' compiled encoder with orient='split':
+    {"columns": [...], "index": [ISO timestamps], "data": [[row], ...]},
+    NaN values become null.
+    """
+    return df.to_json(orient='split', date_format='iso', date_unit='s').encode('utf-8')
+
+def _flat_columns(df: pd.DataFrame) -> list:
+    """Column names as strings (tuple labels are joined with '.')"""
+    return ['.'.join(map(str, column)) if isinstance(column, tuple) else str(column) for column in df.columns]
+
+def encode_arrow(df: pd.DataFrame) -> bytes:
+    """
+    Encode a frame as an Arrow IPC stream with a 'timestamp' column first.
+
+    Numeric columns are handed to Arrow without conversion, so the cost is
+    essentially one copy into the output buffer.
+    """
+    arrays = [pa.array(np.asarray(df.index, dtype='datetime64[ns]'))]
+    arrays += [pa.array(df.iloc[:, i].to_numpy()) for i in range(df.shape[1])]
+    batch = pa.RecordBatch.from_arrays(arrays, names=[INDEX_FIELD] + _flat_columns(df))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+def encode_npy(df: pd.DataFrame) -> bytes:
+    """
+    Encode a frame as one .npy file holding a little-endian structured array.
+
+    Fields are 'timestamp' (datetime64[ns]) followed by the frame's columns,
+    so np.load(io.BytesIO(body)) gives back named columns without parsing.
+    """
+    names = [INDEX_FIELD] + _flat_columns(df)
+    columns = [np.asarray(df.index, dtype='datetime64[ns]')] + [df.iloc[:, i].to_numpy() for i in range(df.shape[1])]
+    dtype = np.dtype([(name, values.dtype.newbyteorder('<')) for name, values in zip(names, columns)])
+    records = np.empty(len(df), dtype=dtype)
+    for name, values in zip(names, columns):
+        records[name] = values
+    buffer = io.BytesIO()
+    np.save(buffer, records, allow_pickle=False)
+    return buffer.getvalue()
+
+ENCODERS = {
+    JSON_TYPE: encode_json,
+    NPY_TYPE: encode_npy
+}
+if pa is not None:
+    ENCODERS[ARROW_TYPE] = encode_arrow
+
+def negotiate(accept: str = None, fmt: str = None):
+    """
+    Pick the response media type.
+
+    Args:
+        accept: Accept header value (e.g. 'application/vnd.apache.arrow.stream, application/json;q=0.5')
+        fmt: Optional ?format= value (json, arrow or npy), which takes precedence
+
+    Returns:
+        A key of ENCODERS, or None if nothing acceptable is supported
+
+    Raises:
+        ValueError: For an unknown format value
+    """
+    if fmt:
+        media_type = FORMAT_TYPES.get(fmt.lower())
+        if media_type is None:
+            raise ValueError(f"Unknown format '{fmt}', choose from: {', '.join(FORMAT_TYPES)}")
+        return media_type if media_type in ENCODERS else None
+    if not accept:
+        return JSON_TYPE
+
+    candidates = []
+    for position, item in enumerate(accept.split(',')):
+        media_type, *options = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for option in options:
+            key, _, value = option.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality <= 0:
+            continue
+        if media_type in ('*/*', 'application/*'):
+            media_type = JSON_TYPE
+        if media_type in ENCODERS:
+            # Highest quality wins, then the order the client listed them in
+            candidates.append((-quality, position, media_type))
+    return min(candidates)[2] if candidates else None
+
+def encode_frame(df: pd.DataFrame, media_type: str) -> bytes:
+    """Encode df in a media type returned by negotiate()"""
+    return ENCODERS[media_type](df)
@@ -0,0 +1,83 @@
+"""
+HTTP query service for bars and indicators (Flask)
+
+    GET /bars/<symbol>/<level>?start=&end=&columns=open,close
+    GET /indicators/<name>/<symbol>/<level>?start=&end=&<param>=<value>
+    POST /indicators/batch (NDJSON stream, see api/batch.py)
+
+Responses are JSON, Arrow IPC streams or .npy structured arrays, chosen by
+the Accept header or ?format=json|arrow|npy (see api/encoding.py).
+
+Run a single process with `python main.py --mode serve`, or several worker
+processes behind gunicorn with the app factory, sharing frames through Redis:
+
+    gunicorn -w 4 -b 0.0.0.0:8000 "api.server:create_app(data_dir='./output', redis_url='redis://localhost:6379/0')"
+
+For many concurrent slow clients see api/async_server.py (--mode serve --async).
+"""
+import logging
+from flask import Flask, Response, jsonify, request
+
+from api.batch import NDJSON_TYPE, parse_batch, batch_group_lines
+from api.service import IndicatorService, handle_request
+from cache.manager import CacheManager
+
+logger = logging.getLogger(__name__)
+
+def create_app(data_dir: str = './output', cache_mb: int = 256, cache_dir: str = None, redis_url: str = None,
+               redis_ttl: int = None, cache: CacheManager = None) -> Flask:
+    """
+    Build the Flask application.
+
+    Args:
+        data_dir: Directory containing stock data files
+        cache_mb: In-process frame cache budget in megabytes (per worker)
+        cache_dir: Optional disk cache directory
+        redis_url: Optional Redis URL shared by every worker (fakeredis:// for in-process)
+        redis_ttl: Expiry of Redis entries in seconds
+        cache: Existing CacheManager to use instead of building one
+    """
+    if cache is None:
+        cache = CacheManager(cache_mb * 1024 * 1024, cache_dir, redis_url=redis_url, redis_ttl=redis_ttl)
+    service = IndicatorService(data_dir, cache)
+
+    app = Flask(__name__)
+    app.config['SERVICE'] = service
+
+    def respond(kind, *path_args):
+        status, headers, body = handle_request(service, kind, path_args, request.args.to_dict(),
+                                               {name.lower(): value for name, value in request.headers.items()})
+        return Response(body, status=status, headers=headers)
+
+    @app.get('/health')
+    def health():
+        return jsonify({'status': 'ok', 'cache': service.cache.stats})
+
+    @app.get('/bars/<symbol>/<level>')
+    def bars(symbol, level):
+        return respond('bars', symbol, level)
+
+    @app.get('/indicators/<name>/<symbol>/<level>')
+    def indicators(name, symbol, level):
+        return respond('indicators', name, symbol, level)
+
+    @app.post('/indicators/batch')
+    def batch():
+        try:
+            lines, groups = parse_batch(request.get_data())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        def stream():
+            yield from lines
+            for group in groups:
+                yield from batch_group_lines(service, group)
+        return Response(stream(), mimetype=NDJSON_TYPE)
+
+    return app
+
+def run_server(host: str = '127.0.0.1', port: int = 8000, **options) -> None:
+    """Serve the API from this process with one thread per connection (see create_app for options)"""
+    app = create_app(**options)
+    logger.info(f"Serving API on http://{host}:{port}")
+    app.run(host=host, port=port, threaded=True)
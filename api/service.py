@@ -0,0 +1,224 @@
+"""Query service behind the HTTP API: bars and indicators sliced by time range, served through the cache"""
+import re
+import json
+import hashlib
+import logging
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import datetime, timezone
+import pandas as pd
+
+from api.encoding import JSON_TYPE, encode_frame, negotiate
+from cache.manager import get_cache_manager
+from data.bar_store import PRICE_COLUMNS, find_bar_file, bar_file_stat
+from indicators import get_indicator
+
+logger = logging.getLogger(__name__)
+
+# Path segments are joined into bar file paths, so only plain names are accepted
+SYMBOL_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9.\-^]{0,31}$')
+LEVEL_PATTERN = re.compile(r'^\d+_(?:minute|day)$')
+
+BAR_COLUMNS = PRICE_COLUMNS + ['volume']
+
+# Query arguments that are not indicator parameters
+RESERVED_ARGS = ('start', 'end', 'columns', 'format')
+
+# Bars are stored tz-naive in the exchange's local time, as Alpha Vantage reports them
+BAR_TIMEZONE = 'America/New_York'
+
+def parse_timestamp(value):
+    """
+    Parse an ISO date/time query argument, or return None if not given.
+
+    Timestamps with an offset (e.g. '2025-07-29T13:30:00.000Z' from JavaScript's
+    toISOString()) are converted to the bars' naive local time.
+    """
+    if value is None or value == '':
+        return None
+    try:
+        timestamp = pd.Timestamp(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid timestamp '{value}'")
+    if pd.isna(timestamp):
+        raise ValueError(f"Invalid timestamp '{value}'")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(BAR_TIMEZONE).tz_localize(None)
+    return timestamp
+
+def slice_frame(df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """Return the rows of a sorted, timestamp-indexed frame within [start, end]"""
+    if start is None and end is None:
+        return df
+    index = df.index
+    lo = index.searchsorted(start, side='left') if start is not None else 0
+    hi = index.searchsorted(end, side='right') if end is not None else len(index)
+    return df.iloc[lo:hi]
+
+def _check_path(symbol: str, level: str) -> None:
+    if not SYMBOL_PATTERN.match(symbol):
+        raise ValueError(f"Invalid symbol '{symbol}'")
+    if not LEVEL_PATTERN.match(level):
+        raise ValueError(f"Invalid time level '{level}'")
+
+class IndicatorService:
+    """
+    Bars and indicators for (symbol, level), sliced by time range.
+
+    Frames come from the cache manager, keyed by the bar file version, so a
+    repeated query costs one stat of the bar file plus a slice; indicators are
+    always calculated over the full history before slicing, so the values in
+    a range do not depend on where the range starts.
+    """
+
+    def __init__(self, data_dir: str = './output', cache=None):
+        self.data_dir = data_dir
+        self.cache = cache or get_cache_manager()
+
+    def bar_stat(self, symbol: str, level: str):
+        """Return the size and mtime of the bar file for (symbol, level), or None if nothing is stored"""
+        _check_path(symbol, level)
+        path = find_bar_file(self.data_dir, symbol, level)
+        return bar_file_stat(path) if path is not None else None
+
+    def bars(self, symbol: str, level: str, start=None, end=None, columns=None):
+        """
+        Args:
+            symbol: Stock symbol
+            level: Time level (e.g., '1_minute', '1_day')
+            start: Optional first timestamp (inclusive)
+            end: Optional last timestamp (inclusive)
+            columns: Optional subset of bar columns
+
+        Returns:
+            Sliced bars, or None if nothing is stored for (symbol, level)
+        """
+        _check_path(symbol, level)
+        if columns is not None:
+            unknown = [column for column in columns if column not in BAR_COLUMNS]
+            if unknown or not columns:
+                raise ValueError(f"Invalid columns '{','.join(unknown)}', choose from: {', '.join(BAR_COLUMNS)}")
+        df = self.cache.load_bars(symbol, level, self.data_dir, columns=columns)
+        if df is None:
+            return None
+        return slice_frame(df, parse_timestamp(start), parse_timestamp(end))
+
+    def indicator(self, name: str, symbol: str, level: str, params: dict = None, start=None, end=None):
+        """
+        Args:
+            name: Registered indicator name (see indicators.INDICATORS)
+            symbol: Stock symbol
+            level: Time level (e.g., '1_minute', '1_day')
+            params: Parameter overrides, values may be strings
+            start: Optional first timestamp (inclusive)
+            end: Optional last timestamp (inclusive)
+
+        Returns:
+            Sliced indicator frame, or None if nothing is stored for (symbol, level)
+
+        Raises:
+            ValueError: For unknown indicators, parameters or malformed arguments
+        """
+        _check_path(symbol, level)
+        df = self.cache.indicator(name, symbol, level, self.data_dir, params)
+        if df is None:
+            return None
+        return slice_frame(df, parse_timestamp(start), parse_timestamp(end))
+
+def _error(status: int, message: str) -> tuple:
+    return status, {'Content-Type': JSON_TYPE}, json.dumps({'error': message}).encode('utf-8')
+
+def _validators(stat: dict, media_type: str, *variant) -> dict:
+    """
+    ETag and Last-Modified headers of a response.
+
+    The ETag hashes the bar file version with everything that selects the
+    response (resource, resolved params, indicator version, range, encoding),
+    so it changes exactly when the body would.
+    """
+    encoded = json.dumps([stat['size'], stat['mtime_ns'], media_type] + list(variant), default=str).encode('utf-8')
+    modified = datetime.fromtimestamp(stat['mtime_ns'] // 10**9, tz=timezone.utc)
+    return {'ETag': f'"{hashlib.blake2b(encoded, digest_size=12).hexdigest()}"',
+            'Last-Modified': format_datetime(modified, usegmt=True)}
+
+def _not_modified(headers: dict, validators: dict) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when no ETags are sent (RFC 9110).
+
+    Last-Modified has one-second resolution, so clients that poll faster than
+    the bars change should send If-None-Match.
+    """
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        if if_none_match.strip() == '*':
+            return True
+        # Weak comparison: W/ prefixes are ignored
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return validators['ETag'] in tags
+    if_modified_since = headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return parsedate_to_datetime(validators['Last-Modified']) <= since
+    return False
+
+def handle_request(service: IndicatorService, kind: str, path_args: tuple, query: dict, headers: dict = None) -> tuple:
+    """
+    Answer one API request independently of the web framework serving it.
+
+    The body is JSON, an Arrow IPC stream or a .npy structured array,
+    negotiated from ?format= or the Accept header (see api.encoding).
+    Responses carry ETag and Last-Modified derived from the bar file
+    version; conditional requests are answered with 304 after a stat of
+    the bar file, before anything is loaded or calculated.
+
+    Args:
+        service: The IndicatorService to query
+        kind: 'bars' (path_args = (symbol, level)) or 'indicators'
+            (path_args = (name, symbol, level))
+        path_args: Values captured from the URL path
+        query: Query arguments as a plain dict
+        headers: Request headers with lower-case names
+
+    Returns:
+        (status, headers, body) with body already encoded
+    """
+    headers = headers or {}
+    start, end = query.get('start'), query.get('end')
+    try:
+        media_type = negotiate(headers.get('accept'), query.get('format'))
+        if media_type is None:
+            return _error(406, 'None of the accepted media types is supported')
+        if kind == 'bars':
+            symbol, level = path_args
+            columns = query.get('columns')
+            columns = [column.strip() for column in columns.split(',')] if columns else None
+            variant = ('bars', columns)
+            compute = lambda: service.bars(symbol, level, start=start, end=end, columns=columns)
+        elif kind == 'indicators':
+            name, symbol, level = path_args
+            spec = get_indicator(name)
+            params = spec.resolve_params({key: value for key, value in query.items() if key not in RESERVED_ARGS})
+            variant = ('indicators', name, spec.version, sorted(params.items()))
+            compute = lambda: service.indicator(name, symbol, level, params=params, start=start, end=end)
+        else:
+            return _error(404, f"Unknown resource '{kind}'")
+
+        stat = service.bar_stat(symbol, level)
+        if stat is None:
+            return _error(404, 'No data for this symbol and time level')
+        response_headers = {'Content-Type': media_type, 'Vary': 'Accept', 'Cache-Control': 'no-cache'}
+        response_headers.update(_validators(stat, media_type, symbol, level, start, end, *variant))
+        if _not_modified(headers, response_headers):
+            del response_headers['Content-Type']
+            return 304, response_headers, b''
+        df = compute()
+    except ValueError as e:
+        return _error(400, str(e))
+
+    if df is None:
+        return _error(404, 'No data for this symbol and time level')
+    return 200, response_headers, encode_frame(df, media_type)
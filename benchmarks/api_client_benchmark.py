@@ -0,0 +1,88 @@
+"""
+Benchmark bare requests.get against the pooled APIClient session.
+
+Starts a local Alpha Vantage style stub server and times the same number of
+intraday requests with and without connection reuse.
+
+    python benchmarks/api_client_benchmark.py --requests 200
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from client.api_client import APIClient
+
+STUB_PAYLOAD = json.dumps({
+    'Meta Data': {'1. Information': 'Intraday (1min) open, high, low, close prices and volume'},
+    'Time Series (1min)': {
+        f'2025-06-30 09:{minute:02d}:00': {
+            '1. open': '202.01', '2. high': '202.19', '3. low': '201.72',
+            '4. close': '201.91', '5. volume': '947489'
+        }
+        for minute in range(30, 60)
+    }
+}).encode('utf-8')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serve a fixed time series payload over HTTP/1.1 keep-alive"""
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; avoid delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(STUB_PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(STUB_PAYLOAD)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def time_requests(fetch, count):
+    """Return per-request latencies in milliseconds"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fetch()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+
+def report(label, latencies):
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:<12} mean={sum(latencies) / len(latencies):.3f}ms p50={p50:.3f}ms p99={p99:.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='APIClient connection pooling benchmark')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per variant')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/query'
+    params = {'function': 'TIME_SERIES_INTRADAY', 'symbol': 'AAPL', 'interval': '1min'}
+
+    try:
+        report('bare get', time_requests(lambda: requests.get(base_url, params=params), args.requests))
+        with APIClient('demo', base_url=base_url) as client:
+            report('pooled', time_requests(lambda: client._get(params), args.requests))
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark the fused rolling-moments BOLL kernel against the pandas path.
+
+Times one long single-symbol series and a (time x symbols) panel, and
+reports the maximum deviation of each from an exact two-pass standard
+deviation.
+
+    python benchmarks/boll_kernel_benchmark.py --rows 1000000 --symbols 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from indicators.kernels import rolling_mean_std
+
+
+def best_of(func, repeat):
+    """Return the best wall time of repeat calls and the last result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def pandas_mean_std(values, window):
+    df = pd.DataFrame(values)
+    rolling = df.rolling(window)
+    return rolling.mean().to_numpy(), rolling.std().to_numpy()
+
+
+def exact_std(values, window):
+    std = sliding_window_view(values, window, axis=0).std(axis=-1, ddof=1)
+    return np.concatenate([np.full((window - 1,) + values.shape[1:], np.nan), std])
+
+
+def run(label, values, window, repeat):
+    kernel_time, (_, kernel_std) = best_of(lambda: rolling_mean_std(values, window), repeat)
+    pandas_time, (_, pandas_std) = best_of(lambda: pandas_mean_std(values, window), repeat)
+    exact = exact_std(values, window)
+    print(f"{label:<22} kernel={kernel_time * 1000:8.1f}ms (err {np.nanmax(np.abs(kernel_std - exact)):.1e})  "
+          f"pandas={pandas_time * 1000:8.1f}ms (err {np.nanmax(np.abs(pandas_std - exact)):.1e})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BOLL rolling-moments kernel benchmark')
+    parser.add_argument('--rows', type=int, default=1000000, help='Bars in the single-symbol series')
+    parser.add_argument('--symbols', type=int, default=500, help='Columns in the panel benchmark')
+    parser.add_argument('--panel-rows', type=int, default=20000, help='Bars per symbol in the panel benchmark')
+    parser.add_argument('--window', type=int, default=20, help='Rolling window')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    series = 200 + np.cumsum(rng.standard_normal(args.rows)) * 0.01
+    panel = 200 + np.cumsum(rng.standard_normal((args.panel_rows, args.symbols)), axis=0) * 0.01
+
+    run(f'1 x {args.rows}', series[:, None], args.window, args.repeat)
+    run(f'{args.symbols} x {args.panel_rows}', panel, args.window, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
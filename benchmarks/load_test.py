@@ -0,0 +1,107 @@
+"""
+Load test for the HTTP query service.
+
+Sends GET requests from concurrent keep-alive clients and reports latency
+percentiles and throughput. Without --url an API server is started in this
+process on a free port, serving --data-dir.
+
+    python benchmarks/load_test.py --data-dir ./output --concurrency 8 --requests 2000
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --path /indicators/rsi/AAPL/1_minute
+    python benchmarks/load_test.py --accept application/vnd.apache.arrow.stream
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+DEFAULT_PATHS = [
+    '/bars/AAPL/1_minute',
+    '/indicators/macd/AAPL/1_minute',
+    '/indicators/boll/AAPL/5_minute',
+    '/indicators/rsi/AAPL/1_minute?start=2025-07-29'
+]
+
+
+def start_local_server(data_dir):
+    """Start the API server in a background thread and return (base_url, server)"""
+    import logging
+    from werkzeug.serving import make_server
+    from api.server import create_app
+
+    # Per-request access logs would dominate the output and the timings
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, create_app(data_dir=data_dir), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', server
+
+
+def run_client(base_url, paths, count, offset, accept=None):
+    """Issue count requests over one keep-alive session; return (latencies in ms, status counts)"""
+    latencies, statuses = [], {}
+    with requests.Session() as session:
+        if accept:
+            session.headers['Accept'] = accept
+        for i in range(count):
+            path = paths[(offset + i) % len(paths)]
+            start = time.perf_counter()
+            response = session.get(base_url + path)
+            response.content
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return latencies, statuses
+
+
+def report(latencies, statuses, elapsed):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"requests={len(latencies)} elapsed={elapsed:.2f}s rps={len(latencies) / elapsed:.1f}")
+    print(f"latency mean={sum(latencies) / len(latencies):.2f}ms p50={p50:.2f}ms p99={p99:.2f}ms max={latencies[-1]:.2f}ms")
+    print(f"status {', '.join(f'{code}={n}' for code, n in sorted(statuses.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API server load test')
+    parser.add_argument('--url', help='Base URL of a running server (default: start one in-process)')
+    parser.add_argument('--data-dir', default='./output', help='Data directory for the in-process server')
+    parser.add_argument('--path', action='append', help='Request path, repeatable (default: a mix of bars and indicators)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Number of concurrent clients')
+    parser.add_argument('--requests', type=int, default=2000, help='Total number of requests')
+    parser.add_argument('--accept', help='Accept header to send (default: JSON)')
+    parser.add_argument('--warmup', type=int, default=20, help='Untimed requests sent first to fill the caches')
+    args = parser.parse_args()
+
+    paths = args.path or DEFAULT_PATHS
+    server = None
+    base_url = args.url.rstrip('/') if args.url else None
+    if base_url is None:
+        base_url, server = start_local_server(args.data_dir)
+
+    try:
+        run_client(base_url, paths, args.warmup, 0, args.accept)
+        per_client = max(1, args.requests // args.concurrency)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(lambda i: run_client(base_url, paths, per_client, i, args.accept), range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+        latencies, statuses = [], {}
+        for client_latencies, client_statuses in results:
+            latencies.extend(client_latencies)
+            for code, n in client_statuses.items():
+                statuses[code] = statuses.get(code, 0) + n
+        report(latencies, statuses, elapsed)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Compact binary encoding of numeric frames for the disk and Redis cache tiers"""
+import json
+import struct
+import numpy as np
+import pandas as pd
+
+# Blob layout: MAGIC, uint32 header length, JSON header, then raw column buffers
+MAGIC = b'CQF1'
+_LENGTH = struct.Struct('<I')
+
+def _le(values: np.ndarray) -> np.ndarray:
+    """Contiguous little-endian copy (or view) of values"""
+    values = np.ascontiguousarray(values)
+    return values.astype(values.dtype.newbyteorder('<'), copy=False)
+
+def encode_frame(df: pd.DataFrame) -> bytes:
+    """
+    Encode a DataFrame of numeric or datetime columns as one binary blob.
+
+    Datetime indexes and columns are stored as int64 nanoseconds and every
+    buffer is little-endian, so blobs are portable across machines.
+
+    Raises:
+        ValueError: If a column or the index is not numeric, boolean or datetime
+    """
+    buffers, columns = [], []
+    for name, values in [(df.index.name, df.index)] + [(column, df[column]) for column in df.columns]:
+        dtype = values.dtype
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            raise ValueError("Timezone-aware columns are not supported by the cache codec")
+        if dtype.kind == 'M':
+            array = np.asarray(values, dtype='datetime64[ns]').view('int64')
+        elif dtype.kind in 'biuf':
+            array = np.asarray(values)
+        else:
+            raise ValueError(f"Unsupported dtype for cache codec: {name} {dtype}")
+        array = _le(array)
+        columns.append({'name': name, 'dtype': array.dtype.str, 'datetime': dtype.kind == 'M', 'nbytes': array.nbytes})
+        buffers.append(array.tobytes())
+
+    header = json.dumps({
+        'rows': len(df),
+        'index': columns[0],
+        'columns': columns[1:],
+        # Column labels may be tuples (e.g. sweep results); keep their levels
+        'column_levels': df.columns.nlevels,
+        'column_names': list(df.columns.names)
+    }).encode('utf-8')
+    return b''.join([MAGIC, _LENGTH.pack(len(header)), header] + buffers)
+
+def decode_frame(blob) -> pd.DataFrame:
+    """
+    Decode a blob written by encode_frame().
+
+    Columns are read-only views into blob when possible, so decoding a large
+    frame does not copy its data.
+    """
+    blob = memoryview(blob)
+    if bytes(blob[:4]) != MAGIC:
+        raise ValueError("Not a cached frame blob")
+    (length,) = _LENGTH.unpack_from(blob, 4)
+    offset = 4 + _LENGTH.size
+    header = json.loads(bytes(blob[offset:offset + length]).decode('utf-8'))
+    offset += length
+
+    arrays = []
+    for column in [header['index']] + header['columns']:
+        array = np.frombuffer(blob, dtype=column['dtype'], count=column['nbytes'] // np.dtype(column['dtype']).itemsize, offset=offset)
+        offset += column['nbytes']
+        if column['datetime']:
+            array = array.astype('<i8', copy=False).view('datetime64[ns]')
+        arrays.append(array)
+
+    index = pd.Index(arrays[0], name=header['index']['name'])
+    names = [column['name'] for column in header['columns']]
+    if header.get('column_levels', 1) > 1:
+        names = pd.MultiIndex.from_tuples([tuple(name) for name in names], names=header.get('column_names'))
+    return pd.DataFrame(dict(zip(range(len(arrays) - 1), arrays[1:])), index=index).set_axis(names, axis=1)
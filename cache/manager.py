@@ -0,0 +1,400 @@
+"""Tiered frame cache: in-process LRU, local disk and optional Redis, keyed by bar file version"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from cache.codec import encode_frame, decode_frame
+from data.bar_store import BAR_FILE_PATTERN, bar_file_stat, find_bar_file, read_bars
+
+logger = logging.getLogger(__name__)
+
+# Default budget of the in-process tier
+DEFAULT_MEMORY_BYTES = 256 * 1024 * 1024
+
+def frame_nbytes(df) -> int:
+    """Approximate memory held by a frame (index included, object payloads not followed)"""
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+def source_version(path: str) -> str:
+    """Version token of a bar file; it changes whenever the file is rewritten or appended to"""
+    stat = bar_file_stat(path)
+    return f"{stat['size']:x}-{stat['mtime_ns']:x}"
+
+def params_token(params: dict) -> str:
+    """Short stable token for a parameter dict"""
+    encoded = json.dumps(params or {}, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=6).hexdigest()
+
+def frame_key(symbol: str, level: str, version: str, *parts) -> str:
+    """Cache key for a frame derived from the (symbol, level) bars at the given version"""
+    return ':'.join([symbol, level, version] + [str(part) for part in parts])
+
+class MemoryTier:
+    """In-process LRU of frames bounded by their total size in bytes"""
+
+    name = 'memory'
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            self._frames.move_to_end(key)
+            return entry[0]
+
+    def get_many(self, keys: list) -> list:
+        return [self.get(key) for key in keys]
+
+    def put(self, key: str, frame) -> None:
+        size = frame_nbytes(frame)
+        # A frame larger than the whole budget would only evict everything else
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._frames[key] = (frame, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                self._pop(next(iter(self._frames)))
+
+    def _pop(self, key: str) -> None:
+        entry = self._frames.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[1]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self.nbytes = 0
+
+class DiskTier:
+    """
+    Frames stored as binary blobs (see cache.codec) in a local directory.
+
+    Files are written under a temporary name and moved into place, so
+    several processes can share the directory. With max_bytes set, the least
+    recently used files are removed once the directory grows past it.
+    """
+
+    name = 'disk'
+
+    def __init__(self, directory: str, max_bytes: int = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()}.cqf")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                blob = file.read()
+            # Recency for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        try:
+            return decode_frame(blob)
+        except ValueError as e:
+            logger.warning(f"Removing unreadable cache file {path}: {str(e)}")
+            self._remove(path)
+            return None
+
+    def get_many(self, keys: list) -> list:
+        return [self.get(key) for key in keys]
+
+    def put(self, key: str, frame) -> None:
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(encode_frame(frame))
+        os.replace(tmp_path, path)
+        if self.max_bytes:
+            self._evict()
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.cqf'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def delete(self, key: str) -> None:
+        self._remove(self._path(key))
+
+    def clear(self) -> None:
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.cqf'):
+                self._remove(entry.path)
+
+class RedisTier:
+    """
+    Frames stored as binary blobs (see cache.codec) in Redis, shared by every process using it.
+
+    Entries expire after ttl seconds when a TTL is set, and multi-key reads
+    and writes each take a single round trip.
+    """
+
+    name = 'redis'
+
+    def __init__(self, client, prefix: str = 'caesar:', ttl: int = None):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = 'caesar:', ttl: int = None) -> 'RedisTier':
+        """
+        Connect to redis://, rediss:// or unix:// URLs, or to an in-process
+        fakeredis server for fakeredis://[host:port/db] (no external service)
+        """
+        if url.startswith('fakeredis://'):
+            import fakeredis
+            # Clients created for the same host share one in-process server
+            client = fakeredis.FakeRedis.from_url('redis://' + (url[len('fakeredis://'):] or 'localhost:6379/0'))
+        else:
+            import redis
+            client = redis.Redis.from_url(url)
+        return cls(client, prefix, ttl)
+
+    def get(self, key: str):
+        blob = self.client.get(self.prefix + key)
+        return decode_frame(blob) if blob is not None else None
+
+    def get_many(self, keys: list) -> list:
+        if not keys:
+            return []
+        blobs = self.client.mget([self.prefix + key for key in keys])
+        return [decode_frame(blob) if blob is not None else None for blob in blobs]
+
+    def put(self, key: str, frame) -> None:
+        self.client.set(self.prefix + key, encode_frame(frame), ex=self.ttl)
+
+    def put_many(self, items: dict) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for key, frame in items.items():
+            pipe.set(self.prefix + key, encode_frame(frame), ex=self.ttl)
+        pipe.execute()
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f'{self.prefix}*'))
+        if keys:
+            self.client.delete(*keys)
+
+class CacheManager:
+    """
+    Read-through cache of bar and indicator frames over memory, disk and Redis tiers.
+
+    Lookups go from the fastest tier to the slowest and a hit is copied into
+    every faster tier. Keys embed the bar file version, so appending bars or
+    rewriting a file makes old entries unreachable instead of stale. Frames
+    handed out are shared between callers and must be treated as read-only.
+
+    A failing disk or Redis tier is logged and skipped; the cache never makes
+    a read fail that would succeed without it.
+    """
+
+    def __init__(self, memory_bytes: int = DEFAULT_MEMORY_BYTES, disk_dir: str = None, disk_bytes: int = None,
+                 redis_url: str = None, redis_client=None, redis_ttl: int = None):
+        """
+        Args:
+            memory_bytes: Budget of the in-process LRU (0 disables it)
+            disk_dir: Directory of the disk tier (None disables it)
+            disk_bytes: Optional size limit of the disk tier
+            redis_url: Redis URL of the shared tier (e.g. redis://localhost:6379/0,
+                or fakeredis:// for an in-process server)
+            redis_client: Existing Redis client to use instead of redis_url
+            redis_ttl: Expiry of Redis entries in seconds (None keeps them)
+        """
+        self.tiers = []
+        if memory_bytes:
+            self.tiers.append(MemoryTier(memory_bytes))
+        if disk_dir:
+            self.tiers.append(DiskTier(disk_dir, disk_bytes))
+        if redis_client is not None:
+            self.tiers.append(RedisTier(redis_client, ttl=redis_ttl))
+        elif redis_url:
+            self.tiers.append(RedisTier.from_url(redis_url, ttl=redis_ttl))
+        self.stats = {tier.name: 0 for tier in self.tiers}
+        self.stats['misses'] = 0
+
+    def _call(self, tier, method: str, *args):
+        try:
+            return getattr(tier, method)(*args)
+        except Exception as e:
+            if isinstance(tier, MemoryTier):
+                raise
+            logger.warning(f"Cache {tier.name} tier {method} failed: {str(e)}")
+            return None
+
+    def get(self, key: str):
+        """Return the cached frame for key, or None"""
+        for i, tier in enumerate(self.tiers):
+            frame = self._call(tier, 'get', key)
+            if frame is not None:
+                self.stats[tier.name] += 1
+                for faster in self.tiers[:i]:
+                    self._call(faster, 'put', key, frame)
+                return frame
+        self.stats['misses'] += 1
+        return None
+
+    def get_many(self, keys: list) -> dict:
+        """
+        Look up several keys, asking each tier only for the keys still missing.
+
+        Returns:
+            Dict mapping each key that was found to its frame
+        """
+        found = {}
+        missing = list(dict.fromkeys(keys))
+        for i, tier in enumerate(self.tiers):
+            if not missing:
+                break
+            frames = self._call(tier, 'get_many', missing) or [None] * len(missing)
+            hits = {key: frame for key, frame in zip(missing, frames) if frame is not None}
+            self.stats[tier.name] += len(hits)
+            for faster in self.tiers[:i]:
+                self._put_many(faster, hits)
+            found.update(hits)
+            missing = [key for key in missing if key not in hits]
+        self.stats['misses'] += len(missing)
+        return found
+
+    def put(self, key: str, frame) -> None:
+        """Store frame in every tier"""
+        for tier in self.tiers:
+            self._call(tier, 'put', key, frame)
+
+    def _put_many(self, tier, items: dict) -> None:
+        if not items:
+            return
+        if hasattr(tier, 'put_many'):
+            self._call(tier, 'put_many', items)
+        else:
+            for key, frame in items.items():
+                self._call(tier, 'put', key, frame)
+
+    def put_many(self, items: dict) -> None:
+        """Store several frames in every tier (one round trip for Redis)"""
+        for tier in self.tiers:
+            self._put_many(tier, items)
+
+    def get_or_compute(self, key: str, compute):
+        """Return the cached frame for key, computing and storing it on a miss"""
+        frame = self.get(key)
+        if frame is None:
+            frame = compute()
+            if frame is not None:
+                self.put(key, frame)
+        return frame
+
+    def delete(self, key: str) -> None:
+        for tier in self.tiers:
+            self._call(tier, 'delete', key)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            self._call(tier, 'clear')
+
+    def read_bars(self, path: str, columns=None):
+        """
+        Read bars from a bar file through the cache.
+
+        Args:
+            path: Bar file named {symbol}_{level}.{ext} (see data.bar_store)
+            columns: Optional subset of columns to load
+        """
+        match = BAR_FILE_PATTERN.match(os.path.basename(path))
+        symbol, level = (match.group('symbol'), match.group('level')) if match else (os.path.basename(path), '')
+        selection = ','.join(columns) if columns is not None else '*'
+        key = frame_key(symbol, level, source_version(path), 'bars', selection)
+        return self.get_or_compute(key, lambda: read_bars(path, columns))
+
+    def load_bars(self, symbol: str, level: str, data_dir: str = './output', columns=None):
+        """Load bars for (symbol, level) through the cache, or None if missing"""
+        path = find_bar_file(data_dir, symbol, level)
+        if path is None:
+            return None
+        return self.read_bars(path, columns)
+
+    def indicator_key(self, name: str, symbol: str, level: str, data_dir: str = './output', params: dict = None):
+        """
+        Return (key, bar file path, resolved params) for an indicator request.
+
+        The key covers the bar file version, the indicator version and its
+        resolved params, so a hit is always what calculate would return now.
+        The key and path are None if no bars are stored.
+        """
+        from indicators import get_indicator
+
+        spec = get_indicator(name)
+        params = spec.resolve_params(params)
+        path = find_bar_file(data_dir, symbol, level)
+        if path is None:
+            return None, None, params
+        return frame_key(symbol, level, source_version(path), name, spec.version, params_token(params)), path, params
+
+    def indicator(self, name: str, symbol: str, level: str, data_dir: str = './output', params: dict = None):
+        """
+        Calculate a registered indicator for (symbol, level) through the cache.
+
+        Returns:
+            Indicator frame indexed by timestamp, or None if no bars are stored
+        """
+        from indicators import get_indicator
+
+        key, path, params = self.indicator_key(name, symbol, level, data_dir, params)
+        if key is None:
+            return None
+        spec = get_indicator(name)
+        return self.get_or_compute(key, lambda: spec.compute(self.read_bars(path, spec.inputs), params))
+
+_shared_cache_manager = None
+_shared_lock = threading.Lock()
+
+def configure_cache_manager(memory_bytes: int = DEFAULT_MEMORY_BYTES, disk_dir: str = None, disk_bytes: int = None,
+                            redis_url: str = None, redis_client=None, redis_ttl: int = None) -> CacheManager:
+    """Replace the process-wide cache manager"""
+    global _shared_cache_manager
+    with _shared_lock:
+        _shared_cache_manager = CacheManager(memory_bytes, disk_dir, disk_bytes, redis_url, redis_client, redis_ttl)
+        return _shared_cache_manager
+
+def get_cache_manager() -> CacheManager:
+    """Return the process-wide cache manager, creating a memory-only one if needed"""
+    global _shared_cache_manager
+    with _shared_lock:
+        if _shared_cache_manager is None:
+            _shared_cache_manager = CacheManager()
+        return _shared_cache_manager
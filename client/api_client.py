@@ -1,33 +1,59 @@
 import requests
 import logging
-import time
 import pandas as pd
+from requests.adapters import HTTPAdapter
+
+from client.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = "https://www.alphavantage.co/query"
+
 class APIClient:
     """External API client for fetching stock data"""
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, pool_size=10, timeout=30, rate_limiter=None):
+        """
+        Args:
+            api_key: Alpha Vantage API key
+            base_url: Query endpoint (override to point at a local stub server)
+            pool_size: Maximum number of keep-alive connections kept in the pool
+            timeout: Per-request timeout in seconds
+            rate_limiter: RateLimiter to draw from (defaults to the process-wide limiter)
+        """
         self.api_key = api_key
-        self.base_url = "https://www.alphavantage.co/query"
+        self.base_url = base_url
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        
+        # One pooled session per client so every request reuses the same
+        # keep-alive TCP/TLS connection instead of paying a new handshake
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Connection': 'keep-alive'})
+        
+    def close(self):
+        """Close the underlying pooled session"""
+        self.session.close()
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
         
-    def fetch_intraday_data(self, symbol, interval):
+    def _get(self, params):
+        """Wait for the rate budget, then issue a GET request on the pooled session"""
+        self.rate_limiter.acquire()
+        return self.session.get(self.base_url, params=params, timeout=self.timeout)
+        
+    def fetch_intraday_data(self, symbol, interval, outputsize='full'):
         """Fetch intraday data from Alpha Vantage API"""
         try:
-            # Alpha Vantage API endpoint for intraday data
-            params = {
-                'function': 'TIME_SERIES_INTRADAY',
-                'symbol': symbol,
-                'interval': interval,
-                'outputsize': 'full',
-                'apikey': self.api_key,
-                'datatype': 'json',
-                'extended_hours': 'false'
-            }
-            
             # Make API request
-            response = requests.get(self.base_url, params=params)
+            response = self._get(build_intraday_params(self.api_key, symbol, interval, outputsize))
             
             # Check if request was successful
             if response.status_code != 200:
@@ -37,68 +63,17 @@ class APIClient:
             # Log the raw response for debugging
             logger.debug(f"Raw API response: {response.text}")
             
-            data = response.json()
-            
-            # Check if we got an error response
-            if 'Error Message' in data:
-                logger.error(f"Alpha Vantage API error: {data['Error Message']}")
-                return None
-                
-            if 'Note' in data:
-                logger.warning(f"Alpha Vantage API note: {data['Note']}")
-                
-            # Get the time series key
-            time_series_key = None
-            for key in data.keys():
-                if key.startswith('Time Series'):
-                    time_series_key = key
-                    break
-                    
-            if not time_series_key:
-                logger.error("Could not find time series data in API response")
-                return None
-                
-            # Convert to DataFrame
-            df = pd.DataFrame.from_dict(data[time_series_key], orient='index')
-            
-            # Convert index to datetime
-            df.index = pd.to_datetime(df.index)
-            
-            # Set column names based on actual data
-            # Alpha Vantage typically returns: open, high, low, close, volume
-            if len(df.columns) >= 5:
-                df.columns = ['open', 'high', 'low', 'close', 'volume']
-                
-                # Try to extract additional bid/ask data if available
-                if len(df.columns) >= 9:
-                    df.columns = ['open', 'high', 'low', 'close', 'volume', 'bid_price', 'ask_price', 'bid_size', 'ask_size']
-            
-            # Convert columns to numeric
-            df = df.apply(pd.to_numeric, errors='coerce')
-            
-            # Sort by timestamp
-            df = df.sort_index()
-            
-            return df
+            return parse_time_series(response.json(), intraday=True)
             
         except Exception as e:
             logger.error(f"Error fetching data from Alpha Vantage: {str(e)}", exc_info=True)
             return None
             
-    def fetch_daily_data(self, symbol):
+    def fetch_daily_data(self, symbol, outputsize='full'):
         """Fetch daily data from Alpha Vantage API"""
         try:
-            # Alpha Vantage API endpoint for daily data
-            params = {
-                'function': 'TIME_SERIES_DAILY',
-                'symbol': symbol,
-                'outputsize': 'full',
-                'apikey': self.api_key,
-                'datatype': 'json'
-            }
-            
             # Make API request
-            response = requests.get(self.base_url, params=params)
+            response = self._get(build_daily_params(self.api_key, symbol, outputsize))
             
             # Check if request was successful
             if response.status_code != 200:
@@ -108,46 +83,77 @@ class APIClient:
             # Log the raw response for debugging
             logger.debug(f"Raw API response: {response.text}")
             
-            data = response.json()
-            
-            # Check if we got an error response
-            if 'Error Message' in data:
-                logger.error(f"Alpha Vantage API error: {data['Error Message']}")
-                return None
-                
-            if 'Note' in data:
-                logger.warning(f"Alpha Vantage API note: {data['Note']}")
-                
-            # Get the time series key
-            time_series_key = None
-            for key in data.keys():
-                if key.startswith('Time Series'):
-                    time_series_key = key
-                    break
-                    
-            if not time_series_key:
-                logger.error("Could not find time series data in API response")
-                return None
-                
-            # Convert to DataFrame
-            df = pd.DataFrame.from_dict(data[time_series_key], orient='index')
-            
-            # Convert index to datetime
-            df.index = pd.to_datetime(df.index)
-            
-            # Set column names based on actual data
-            # Alpha Vantage typically returns: open, high, low, close, volume
-            if len(df.columns) >= 5:
-                df.columns = ['open', 'high', 'low', 'close', 'volume']
-            
-            # Convert columns to numeric
-            df = df.apply(pd.to_numeric, errors='coerce')
-            
-            # Sort by timestamp
-            df = df.sort_index()
-            
-            return df
+            return parse_time_series(response.json(), intraday=False)
             
         except Exception as e:
             logger.error(f"Error fetching data from Alpha Vantage: {str(e)}", exc_info=True)
-            return None
\ No newline at end of file
+            return None
+
+
+def build_intraday_params(api_key, symbol, interval, outputsize='full'):
+    """Build query parameters for the Alpha Vantage intraday endpoint ('compact' returns the latest 100 bars)"""
+    return {
+        'function': 'TIME_SERIES_INTRADAY',
+        'symbol': symbol,
+        'interval': interval,
+        'outputsize': outputsize,
+        'apikey': api_key,
+        'datatype': 'json',
+        'extended_hours': 'false'
+    }
+
+
+def build_daily_params(api_key, symbol, outputsize='full'):
+    """Build query parameters for the Alpha Vantage daily endpoint ('compact' returns the latest 100 bars)"""
+    return {
+        'function': 'TIME_SERIES_DAILY',
+        'symbol': symbol,
+        'outputsize': outputsize,
+        'apikey': api_key,
+        'datatype': 'json'
+    }
+
+
+def parse_time_series(data, intraday=True):
+    """Convert a decoded Alpha Vantage JSON response into a sorted OHLCV DataFrame"""
+    # Check if we got an error response
+    if 'Error Message' in data:
+        logger.error(f"Alpha Vantage API error: {data['Error Message']}")
+        return None
+        
+    if 'Note' in data:
+        logger.warning(f"Alpha Vantage API note: {data['Note']}")
+        
+    # Get the time series key
+    time_series_key = None
+    for key in data.keys():
+        if key.startswith('Time Series'):
+            time_series_key = key
+            break
+            
+    if not time_series_key:
+        logger.error("Could not find time series data in API response")
+        return None
+        
+    # Convert to DataFrame
+    df = pd.DataFrame.from_dict(data[time_series_key], orient='index')
+    
+    # Convert index to datetime
+    df.index = pd.to_datetime(df.index)
+    
+    # Set column names based on actual data
+    # Alpha Vantage typically returns: open, high, low, close, volume
+    if len(df.columns) >= 5:
+        df.columns = ['open', 'high', 'low', 'close', 'volume']
+        
+        # Try to extract additional bid/ask data if available
+        if intraday and len(df.columns) >= 9:
+            df.columns = ['open', 'high', 'low', 'close', 'volume', 'bid_price', 'ask_price', 'bid_size', 'ask_size']
+    
+    # Convert columns to numeric
+    df = df.apply(pd.to_numeric, errors='coerce')
+    
+    # Sort by timestamp
+    df = df.sort_index()
+    
+    return df
@@ -0,0 +1,65 @@
+import logging
+import aiohttp
+
+from client.api_client import DEFAULT_BASE_URL, build_intraday_params, build_daily_params, parse_time_series
+from client.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+class AsyncAPIClient:
+    """aiohttp based Alpha Vantage client that keeps many requests in flight"""
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, concurrency=10, timeout=30, rate_limiter=None):
+        """
+        Args:
+            api_key: Alpha Vantage API key
+            base_url: Query endpoint (override to point at a local stub server)
+            concurrency: Maximum number of requests in flight at once
+            timeout: Per-request timeout in seconds
+            rate_limiter: RateLimiter to draw from (defaults to the process-wide limiter)
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.session.close()
+
+    async def _get(self, params):
+        """Wait for the rate budget, then issue a GET request on the shared session"""
+        await self.rate_limiter.acquire_async()
+        async with self.session.get(self.base_url, params=params) as response:
+            if response.status != 200:
+                logger.error(f"API request failed with status code {response.status}")
+                return None
+            return await response.json(content_type=None)
+
+    async def fetch_intraday_data(self, symbol, interval, outputsize='full'):
+        """Fetch intraday data from Alpha Vantage API"""
+        try:
+            data = await self._get(build_intraday_params(self.api_key, symbol, interval, outputsize))
+            if data is None:
+                return None
+            return parse_time_series(data, intraday=True)
+        except Exception as e:
+            logger.error(f"Error fetching data from Alpha Vantage: {str(e)}", exc_info=True)
+            return None
+
+    async def fetch_daily_data(self, symbol, outputsize='full'):
+        """Fetch daily data from Alpha Vantage API"""
+        try:
+            data = await self._get(build_daily_params(self.api_key, symbol, outputsize))
+            if data is None:
+                return None
+            return parse_time_series(data, intraday=False)
+        except Exception as e:
+            logger.error(f"Error fetching data from Alpha Vantage: {str(e)}", exc_info=True)
+            return None
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """
+    Token bucket rate limiter for API requests.
+
+    The bucket holds up to `burst` tokens and refills at `requests_per_minute`.
+    Each request takes one token and only waits when the bucket is empty.
+    When `lock_file` is given the bucket state lives in that file and is
+    updated under an exclusive flock, so several processes share one budget.
+    """
+
+    def __init__(self, requests_per_minute=5, burst=1, lock_file=None):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.rate = requests_per_minute / 60.0
+        self.lock_file = lock_file
+        if lock_file and fcntl is None:
+            logger.warning("File locking is not supported on this platform, rate limit is per process only")
+            self.lock_file = None
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.time()
+
+    def _refill(self, tokens, updated, now):
+        """Return the token count after refilling from `updated` to `now`"""
+        return min(float(self.burst), tokens + (now - updated) * self.rate)
+
+    def _reserve_local(self):
+        """Take one token from the in-process bucket and return the required wait"""
+        with self._lock:
+            now = time.time()
+            self._tokens = self._refill(self._tokens, self._updated, now) - 1
+            self._updated = now
+            return max(0.0, -self._tokens / self.rate)
+
+    def _reserve_shared(self):
+        """Take one token from the file-backed bucket and return the required wait"""
+        with self._lock, open(self.lock_file, 'a+') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                content = file.read()
+                now = time.time()
+                try:
+                    state = json.loads(content) if content else {}
+                    tokens = self._refill(float(state['tokens']), float(state['updated']), now)
+                except (ValueError, KeyError):
+                    tokens = float(self.burst)
+                tokens -= 1
+                file.seek(0)
+                file.truncate()
+                file.write(json.dumps({'tokens': tokens, 'updated': now}))
+                file.flush()
+                return max(0.0, -tokens / self.rate)
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def _reserve(self):
+        if self.lock_file:
+            return self._reserve_shared()
+        return self._reserve_local()
+
+    def acquire(self):
+        """Block until a request may be issued, returning the seconds waited"""
+        wait = self._reserve()
+        if wait > 0:
+            logger.debug(f"Rate limit budget exhausted, sleeping {wait:.2f}s")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        """Asynchronous variant of acquire() that sleeps without blocking the event loop"""
+        wait = self._reserve()
+        if wait > 0:
+            logger.debug(f"Rate limit budget exhausted, sleeping {wait:.2f}s")
+            await asyncio.sleep(wait)
+        return wait
+
+
+_shared_rate_limiter = None
+_shared_lock = threading.Lock()
+
+def configure_rate_limiter(requests_per_minute=5, burst=1, lock_file=None):
+    """Replace the process-wide rate limiter used by every API client"""
+    global _shared_rate_limiter
+    with _shared_lock:
+        if lock_file:
+            lock_file = os.path.abspath(lock_file)
+        _shared_rate_limiter = RateLimiter(requests_per_minute, burst, lock_file)
+        return _shared_rate_limiter
+
+def get_rate_limiter():
+    """Return the process-wide rate limiter, creating the free-tier default if needed"""
+    global _shared_rate_limiter
+    with _shared_lock:
+        if _shared_rate_limiter is None:
+            # Alpha Vantage free tier: 5 requests per minute
+            _shared_rate_limiter = RateLimiter()
+        return _shared_rate_limiter
@@ -0,0 +1,285 @@
+"""Bar store: typed OHLCV storage in CSV, Parquet, Feather or memory-mapped .npy columns"""
+import io
+import os
+import re
+import logging
+import numpy as np
+import pandas as pd
+
+from data.column_store import HEADER_FILE, write_columns, read_columns
+
+logger = logging.getLogger(__name__)
+
+# Supported on-disk formats, in lookup preference order (columnar first)
+BAR_FORMATS = ('npy', 'parquet', 'feather', 'csv')
+
+# 'npy' bars are a directory holding one .npy file per column (see data/column_store.py)
+FILE_EXTENSIONS = {
+    'npy': '.columns',
+    'parquet': '.parquet',
+    'feather': '.feather',
+    'csv': '.csv'
+}
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+# Bar files are named {symbol}_{level}.{ext}, e.g. AAPL_5_minute.csv
+BAR_FILE_PATTERN = re.compile(r'^(?P<symbol>.+)_(?P<level>\d+_(?:minute|day))\.(?P<ext>csv|parquet|feather|columns)$')
+
+def bar_file(data_dir: str, symbol: str, level: str, fmt: str = 'csv') -> str:
+    """Return the path of the bar file for (symbol, level) in the given format"""
+    return os.path.join(data_dir, symbol, f'{symbol}_{level}{FILE_EXTENSIONS[fmt]}')
+
+def find_bar_file(data_dir: str, symbol: str, level: str):
+    """
+    Return the existing bar file for (symbol, level), or None.
+
+    When several formats exist the most recently written one wins, so a CSV
+    refreshed after a migration is never shadowed by a stale Parquet copy.
+    Ties go to the columnar formats.
+    """
+    candidates = []
+    for preference, fmt in enumerate(BAR_FORMATS):
+        path = bar_file(data_dir, symbol, level, fmt)
+        if os.path.exists(path):
+            candidates.append((os.path.getmtime(path), -preference, path))
+    return max(candidates)[2] if candidates else None
+
+def bar_format(path: str) -> str:
+    """Infer the storage format from a bar file extension"""
+    for fmt, ext in FILE_EXTENSIONS.items():
+        if path.endswith(ext):
+            return fmt
+    raise ValueError(f"Unknown bar file format: {path}")
+
+def to_typed_frame(df: pd.DataFrame, price_dtype: str = 'float64') -> pd.DataFrame:
+    """
+    Convert a timestamp-indexed bar DataFrame to the typed on-disk layout.
+
+    Args:
+        df: Bars indexed by timestamp
+        price_dtype: 'float32' or 'float64' for the OHLC columns
+
+    Returns:
+        DataFrame with an int64 nanosecond 'timestamp' column, OHLC prices in
+        price_dtype, int64 volume and any extra columns as float64
+    """
+    typed = pd.DataFrame({'timestamp': pd.DatetimeIndex(df.index).astype('datetime64[ns]').asi8})
+    for column in df.columns:
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy()
+        if column in PRICE_COLUMNS:
+            typed[column] = values.astype(price_dtype)
+        elif column == 'volume' and not np.isnan(values.astype('float64')).any():
+            typed[column] = values.astype('int64')
+        else:
+            typed[column] = values.astype('float64')
+    return typed
+
+def from_typed_frame(typed: pd.DataFrame) -> pd.DataFrame:
+    """Convert the typed on-disk layout back to a timestamp-indexed DataFrame"""
+    index = pd.DatetimeIndex(pd.to_datetime(typed['timestamp'].to_numpy(dtype='int64'), unit='ns'))
+    return typed.drop(columns='timestamp').set_index(index)
+
+def read_bars(path: str, columns=None) -> pd.DataFrame:
+    """
+    Read a bar file into a DataFrame indexed by timestamp.
+
+    Args:
+        path: Bar file path (.csv, .parquet, .feather or a .columns directory)
+        columns: Optional subset of columns to load; columnar formats skip the rest
+    """
+    fmt = bar_format(path)
+    if fmt == 'npy':
+        # Memory-mapped, zero-copy columns
+        return read_columns(path, columns)
+    if fmt == 'csv':
+        df = pd.read_csv(path, index_col=0)
+        df.index = pd.to_datetime(df.index)
+        return df[list(columns)] if columns is not None else df
+
+    load_columns = ['timestamp'] + list(columns) if columns is not None else None
+    if fmt == 'parquet':
+        typed = pd.read_parquet(path, columns=load_columns)
+    else:
+        typed = pd.read_feather(path, columns=load_columns)
+    return from_typed_frame(typed)
+
+def read_bar_tail(path: str, rows: int, size: int, overlap: int, columns=None):
+    """
+    Read the bars after the first rows rows, preceded by the last overlap of those rows.
+
+    For CSV only the end of the file is read: the first rows rows are assumed
+    to end at byte size (the file size when they were all the file held), so
+    the cost grows with the number of rows appended since, not with the whole
+    history. Columnar formats load the requested columns and slice them
+    (without copying for .npy stores). Callers should verify the overlap rows
+    against what they expect before trusting the alignment.
+
+    Args:
+        path: Bar file path
+        rows: Number of leading rows already processed
+        size: Byte size of the file when it held exactly those rows (used for CSV)
+        overlap: Number of processed rows to return before the new ones
+        columns: Optional subset of columns to load
+
+    Returns:
+        DataFrame starting at row rows - min(overlap, rows), or None if the
+        file no longer holds rows rows or is not line-aligned at size
+    """
+    overlap = min(overlap, rows)
+    if bar_format(path) != 'csv':
+        df = read_bars(path, columns)
+        return df.iloc[rows - overlap:] if len(df) >= rows else None
+
+    with open(path, 'rb') as file:
+        header = file.readline()
+        if os.fstat(file.fileno()).st_size < size or size < len(header):
+            return None
+        # Grow a window ending at byte size until it holds `overlap` complete rows
+        block = 4096
+        while True:
+            start = max(len(header), size - block)
+            file.seek(start)
+            window = file.read(size - start)
+            if window and not window.endswith(b'\n'):
+                return None
+            lines = window.split(b'\n')[:-1]
+            # The first line is cut by the window unless it starts right after the header
+            complete = lines if start == len(header) else lines[1:]
+            if len(complete) >= overlap or start == len(header):
+                break
+            block *= 4
+        if len(complete) < overlap:
+            return None
+        tail_start = size - sum(len(line) + 1 for line in complete[len(complete) - overlap:]) if overlap else size
+        file.seek(tail_start)
+        data = file.read()
+
+    df = pd.read_csv(io.BytesIO(header + data), index_col=0)
+    df.index = pd.to_datetime(df.index)
+    return df[list(columns)] if columns is not None else df
+
+def bar_file_stat(path: str) -> dict:
+    """
+    Return the size and modification time of a bar file.
+
+    For .npy column stores the header is used: it is replaced last on every
+    write, so its mtime changes whenever any column does.
+    """
+    target = os.path.join(path, HEADER_FILE) if bar_format(path) == 'npy' else path
+    stat = os.stat(target)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def load_bars(symbol: str, level: str, data_dir: str = './output', columns=None):
+    """Load bars for (symbol, level) from whichever format is stored, or None if missing"""
+    path = find_bar_file(data_dir, symbol, level)
+    if path is None:
+        return None
+    return read_bars(path, columns)
+
+def write_bars(df: pd.DataFrame, path: str, price_dtype: str = 'float64') -> None:
+    """Write timestamp-indexed bars to path in the format given by its extension"""
+    fmt = bar_format(path)
+    if fmt == 'csv':
+        df.to_csv(path)
+    elif fmt == 'npy':
+        write_columns(to_typed_frame(df, price_dtype), path)
+    elif fmt == 'parquet':
+        to_typed_frame(df, price_dtype).to_parquet(path, index=False)
+    else:
+        to_typed_frame(df, price_dtype).to_feather(path)
+
+def read_last_timestamp(path: str):
+    """Return the timestamp of the last stored bar without loading the whole file"""
+    if not os.path.exists(path):
+        return None
+
+    if bar_format(path) != 'csv':
+        timestamps = read_bars(path, columns=[]).index
+        return timestamps[-1] if len(timestamps) else None
+
+    with open(path, 'rb') as file:
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        # Grow the tail window until it holds at least one complete data row
+        block = 1024
+        while True:
+            file.seek(max(0, size - block))
+            lines = file.read().splitlines()
+            if len(lines) >= 2 or block >= size:
+                break
+            block *= 2
+
+    # The first line is either the header or a partial row cut by the tail window
+    for line in reversed(lines[1:]):
+        line = line.decode('utf-8').strip()
+        if line:
+            try:
+                return pd.Timestamp(line.split(',', 1)[0])
+            except ValueError:
+                return None
+    return None
+
+def append_bars(df: pd.DataFrame, path: str, last_timestamp) -> int:
+    """
+    Append bars newer than last_timestamp to an existing bar file.
+
+    CSV files are appended in place in the column order of the existing
+    header. Columnar files cannot be appended to, so they are merged and
+    rewritten with their existing dtypes.
+
+    Returns:
+        Number of rows appended
+    """
+    new_bars = df[df.index > last_timestamp]
+    new_bars = new_bars[~new_bars.index.duplicated(keep='last')]
+    if new_bars.empty:
+        return 0
+
+    if bar_format(path) == 'csv':
+        with open(path, 'r', encoding='utf-8') as file:
+            columns = file.readline().strip().split(',')[1:]
+        new_bars.reindex(columns=columns).to_csv(path, mode='a', header=False)
+        return len(new_bars)
+
+    existing = read_bars(path)
+    price_dtype = str(existing['close'].dtype) if 'close' in existing else 'float64'
+    merged = pd.concat([existing, new_bars.reindex(columns=existing.columns)])
+    write_bars(merged, path, price_dtype)
+    return len(new_bars)
+
+def migrate_tree(data_dir: str = './output', fmt: str = 'parquet', price_dtype: str = 'float64', remove_source: bool = False) -> int:
+    """
+    Convert every {symbol}/{symbol}_{level}.csv bar file under data_dir to fmt.
+
+    Indicator outputs and other CSVs are left alone. Conversion is skipped when
+    the target file is already newer than its source.
+
+    Returns:
+        Number of files converted
+    """
+    converted = 0
+    for symbol in sorted(os.listdir(data_dir)):
+        symbol_dir = os.path.join(data_dir, symbol)
+        if not os.path.isdir(symbol_dir):
+            continue
+        for filename in sorted(os.listdir(symbol_dir)):
+            match = BAR_FILE_PATTERN.match(filename)
+            if not match or match.group('symbol') != symbol or match.group('ext') != 'csv':
+                continue
+
+            source = os.path.join(symbol_dir, filename)
+            target = bar_file(data_dir, symbol, match.group('level'), fmt)
+            if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+                logger.info(f"{target} is up to date, skipping")
+                continue
+
+            try:
+                write_bars(read_bars(source), target, price_dtype)
+                converted += 1
+                logger.info(f"Converted {source} to {target}")
+                if remove_source:
+                    os.remove(source)
+            except Exception as e:
+                logger.error(f"Error converting {source}: {str(e)}", exc_info=True)
+    return converted
@@ -0,0 +1,111 @@
+"""Column store: one .npy file per bar column, memory-mapped on read"""
+import os
+import json
+import time
+import shutil
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Layout version recorded in header.json
+COLUMN_STORE_VERSION = 1
+
+HEADER_FILE = 'header.json'
+
+# Attempts at mapping a store whose current version is replaced meanwhile
+READ_ATTEMPTS = 3
+
+def read_header(column_dir: str) -> dict:
+    """Read the JSON header describing the rows and column dtypes of a column directory"""
+    with open(os.path.join(column_dir, HEADER_FILE), 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def version_dir(column_dir: str, header: dict) -> str:
+    """Return the directory holding the column files of the version a header describes"""
+    return os.path.join(column_dir, header['data'])
+
+def write_columns(typed: pd.DataFrame, column_dir: str) -> None:
+    """
+    Write a typed bar frame (see bar_store.to_typed_frame) as one .npy file per column.
+
+    Each write goes to a new version subdirectory, and replacing header.json,
+    which names that subdirectory, publishes all columns in one atomic step:
+    readers see either the old or the new version, never a mix. Superseded
+    versions are removed afterwards; processes that already mapped them keep
+    their pages, and readers that lose the race re-read the header (see
+    read_columns). Concurrent writers to one store are not supported.
+    """
+    os.makedirs(column_dir, exist_ok=True)
+    # Fixed-width hex so names sort in write order
+    version = f'v{time.time_ns():016x}-{os.getpid()}'
+    directory = os.path.join(column_dir, version)
+    os.makedirs(directory)
+
+    columns = {}
+    for column in typed.columns:
+        values = np.ascontiguousarray(typed[column].to_numpy())
+        # Pin little-endian so the files are portable across machines
+        values = values.astype(values.dtype.newbyteorder('<'), copy=False)
+        np.save(os.path.join(directory, f'{column}.npy'), values)
+        columns[column] = values.dtype.str
+
+    header = {'version': COLUMN_STORE_VERSION, 'rows': len(typed), 'columns': columns, 'data': version}
+    header_path = os.path.join(column_dir, HEADER_FILE)
+    with open(f'{header_path}.tmp', 'w', encoding='utf-8') as file:
+        json.dump(header, file)
+    os.replace(f'{header_path}.tmp', header_path)
+    _remove_superseded(column_dir, version)
+
+def _remove_superseded(column_dir: str, current: str) -> None:
+    """Delete version subdirectories older than current"""
+    for entry in os.scandir(column_dir):
+        if entry.is_dir() and entry.name.startswith('v') and entry.name < current:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+def open_column(column_dir: str, column: str, header: dict = None) -> np.ndarray:
+    """Return a read-only memory map of one column, backed by the shared page cache"""
+    header = header or read_header(column_dir)
+    return np.load(os.path.join(version_dir(column_dir, header), f'{column}.npy'), mmap_mode='r')
+
+def _map_columns(column_dir: str, header: dict, names: list) -> pd.DataFrame:
+    """Map the columns of the version a header describes, checking their lengths against it"""
+    arrays = {name: open_column(column_dir, name, header) for name in ['timestamp'] + names}
+    for name, values in arrays.items():
+        if len(values) != header['rows']:
+            raise ValueError(f"Column '{name}' in {column_dir} has {len(values)} rows, header says {header['rows']}")
+    index = pd.DatetimeIndex(arrays.pop('timestamp').view('datetime64[ns]'))
+    data = {name: pd.Series(values, index=index, copy=False) for name, values in arrays.items()}
+    return pd.DataFrame(data, index=index, copy=False)
+
+def read_columns(column_dir: str, columns=None) -> pd.DataFrame:
+    """
+    Build a timestamp-indexed DataFrame over memory-mapped columns.
+
+    The column data is not copied: each column is a read-only view of its
+    .npy file, so many worker processes reading the same bars share pages.
+    All columns come from the version named by one read of the header.
+
+    Args:
+        column_dir: Column directory written by write_columns()
+        columns: Optional subset of columns to map (default: all)
+
+    Raises:
+        KeyError: If a requested column is not stored
+        ValueError: If a column's length does not match the header
+    """
+    for attempt in range(READ_ATTEMPTS):
+        header = read_header(column_dir)
+        names = [name for name in header['columns'] if name != 'timestamp']
+        if columns is not None:
+            missing = [name for name in columns if name not in header['columns']]
+            if missing:
+                raise KeyError(f"Columns not stored in {column_dir}: {missing}")
+            names = list(columns)
+        try:
+            return _map_columns(column_dir, header, names)
+        except FileNotFoundError:
+            # The version was superseded and removed between reading the header and mapping it
+            if attempt == READ_ATTEMPTS - 1:
+                raise
@@ -1,7 +1,8 @@
+import asyncio
+import numpy as np
 import pandas as pd
 import os
 import logging
-import time
 import sys
 from datetime import datetime
 
@@ -10,15 +11,84 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from config.reader import load_factors_config, get_minute_levels, load_symbols_config, get_symbols
 from client.api_client import APIClient
+from data.bar_store import bar_file, read_last_timestamp, write_bars, append_bars
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def fetch_stock_data(symbol, api_key, output='./output'):
+# Map minute levels to Alpha Vantage intervals
+INTERVAL_MAPPING = {
+    '1_minute': '1min',
+    '5_minute': '5min',
+    '15_minute': '15min',
+    '30_minute': '30min',
+    '1_day': 'daily'
+}
+
+# Alpha Vantage 'compact' responses hold the latest 100 bars
+COMPACT_SIZE = 100
+
+# Regular trading session; intraday requests exclude extended hours
+TRADING_MINUTES_PER_DAY = 390
+SESSION_CLOSE = pd.Timedelta(hours=16)
+
+def choose_outputsize(last_timestamp, minute_level, now=None):
+    """Pick 'compact' when the bars missing since last_timestamp fit in one compact response"""
+    if last_timestamp is None:
+        return 'full'
+    
+    now = now or datetime.now()
+    # Business days after the last stored bar that may have produced new bars
+    start = (last_timestamp + pd.Timedelta(days=1)).date()
+    end = (pd.Timestamp(now) + pd.Timedelta(days=1)).date()
+    days = int(np.busday_count(start, end)) if start < end else 0
+    
+    if minute_level == '1_day':
+        missing = days
+    else:
+        minutes = int(minute_level.split('_')[0])
+        session_close = last_timestamp.normalize() + SESSION_CLOSE
+        if days == 0:
+            # Same session: only the bars printed since the last stored one
+            missing = (min(pd.Timestamp(now), session_close) - last_timestamp) / pd.Timedelta(minutes=minutes)
+        else:
+            # Rest of the last stored session plus every full session since
+            missing = ((session_close - last_timestamp) / pd.Timedelta(minutes=minutes)
+                       + days * (TRADING_MINUTES_PER_DAY // minutes))
+    
+    return 'compact' if missing < COMPACT_SIZE else 'full'
+
+def save_bars(df, filename, last_timestamp=None):
+    """
+    Save fetched bars to the bar store.
+    
+    Without last_timestamp the file is (re)written in full. Otherwise only bars
+    newer than last_timestamp are appended to the existing file.
+    
+    Returns:
+        Number of rows written
+    """
+    if last_timestamp is None:
+        write_bars(df, filename)
+        return len(df)
+    return append_bars(df, filename, last_timestamp)
+
+def gap_covered(df, last_timestamp):
+    """Whether a compact response reaches back to the last stored bar"""
+    return df is not None and not df.empty and df.index.min() <= last_timestamp
+
+def fetch_stock_data(symbol, api_key, output='./output', api_client=None, incremental=False, store_format='csv'):
     """
     Fetch stock data for a given symbol from Alpha Vantage API and save to CSV files.
+    
+    An existing APIClient can be passed in to reuse its pooled connections
+    across symbols; otherwise a client is created and closed for this call.
+    With incremental=True only bars newer than the last stored row are
+    requested (compact output when it covers the gap) and appended.
+    store_format selects the bar store format ('csv', 'parquet', 'feather' or 'npy').
     """
+    owns_client = api_client is None
     try:
         # Create output directory if it doesn't exist
         if not os.path.exists(output):
@@ -37,17 +107,9 @@ def fetch_stock_data(symbol, api_key, output='./output'):
             logger.error("No minute levels found in configuration")
             return
         
-        # Map minute levels to Alpha Vantage intervals
-        interval_mapping = {
-            '1_minute': '1min',
-            '5_minute': '5min',
-            '15_minute': '15min',
-            '30_minute': '30min',
-            '1_day': 'daily'
-        }
-        
-        # Initialize API client
-        api_client = APIClient(api_key)
+        # Initialize API client unless the caller shares one
+        if owns_client:
+            api_client = APIClient(api_key)
         
         # Create symbol-specific directory
         symbol_output_dir = os.path.join(output, symbol)
@@ -57,38 +119,48 @@ def fetch_stock_data(symbol, api_key, output='./output'):
         
         # Process each minute level
         for minute_level in minute_levels:
-            if minute_level not in interval_mapping:
+            if minute_level not in INTERVAL_MAPPING:
                 logger.warning(f"Unknown minute level: {minute_level}")
                 continue
                 
-            interval = interval_mapping[minute_level]
-            logger.info(f"Fetching {minute_level} ({interval}) data for {symbol} from Alpha Vantage...")
+            interval = INTERVAL_MAPPING[minute_level]
+            filename = bar_file(output, symbol, minute_level, store_format)
+            last_timestamp = read_last_timestamp(filename) if incremental else None
+            outputsize = choose_outputsize(last_timestamp, minute_level)
+            logger.info(f"Fetching {minute_level} ({interval}, {outputsize}) data for {symbol} from Alpha Vantage...")
             
             # Fetch data from Alpha Vantage
             if minute_level == '1_day':
-                df = api_client.fetch_daily_data(symbol)
+                df = api_client.fetch_daily_data(symbol, outputsize)
             else:
-                df = api_client.fetch_intraday_data(symbol, interval)
+                df = api_client.fetch_intraday_data(symbol, interval, outputsize)
+            
+            # Fall back to a full download when the compact window misses the gap
+            if outputsize == 'compact' and not gap_covered(df, last_timestamp):
+                logger.info(f"Compact data does not cover the gap since {last_timestamp}, fetching full history")
+                if minute_level == '1_day':
+                    df = api_client.fetch_daily_data(symbol)
+                else:
+                    df = api_client.fetch_intraday_data(symbol, interval)
             
             if df is None or df.empty:
                 logger.warning(f"No data fetched for {minute_level} interval")
                 continue
             
-            # Save to CSV with simplified filename (without timestamp)
-            filename = f"{symbol_output_dir}/{symbol}_{minute_level}.csv"
-            df.to_csv(filename)
-            logger.info(f"Saved {len(df)} rows to {filename}")
-            
-            # Add delay to respect API rate limits
-            time.sleep(12)  # Alpha Vantage free tier: 5 requests per minute (12 seconds between requests)
+            # Save to the bar store with simplified filename (without timestamp)
+            rows = save_bars(df, filename, last_timestamp)
+            logger.info(f"Saved {rows} rows to {filename}")
             
         logger.info("Data fetching completed successfully")
         
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}", exc_info=True)
         raise
+    finally:
+        if owns_client and api_client is not None:
+            api_client.close()
 
-def fetch_all_stocks_data(api_key, output='./output'):
+def fetch_all_stocks_data(api_key, output='./output', pool_size=10, incremental=False, store_format='csv'):
     """Fetch stock data for all symbols in the configuration file."""
     try:
         # Load symbols configuration
@@ -103,13 +175,109 @@ def fetch_all_stocks_data(api_key, output='./output'):
             logger.error("No symbols found in configuration")
             return
         
-        # Fetch data for each symbol
-        for symbol in symbols:
-            logger.info(f"Fetching data for symbol: {symbol}")
-            fetch_stock_data(symbol, api_key, output)
+        # Fetch data for each symbol, sharing one pooled client across all of them
+        with APIClient(api_key, pool_size=pool_size) as api_client:
+            for symbol in symbols:
+                logger.info(f"Fetching data for symbol: {symbol}")
+                fetch_stock_data(symbol, api_key, output, api_client=api_client,
+                                 incremental=incremental, store_format=store_format)
             
         logger.info("Data fetching for all symbols completed successfully")
         
     except Exception as e:
         logger.error(f"An error occurred while fetching data for all symbols: {str(e)}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
+
+async def _fetch_and_save_async(api_client, symbol, minute_level, output, incremental=False, store_format='csv'):
+    """Fetch one (symbol, minute level) series and save it to the bar store"""
+    interval = INTERVAL_MAPPING[minute_level]
+    symbol_output_dir = os.path.join(output, symbol)
+    filename = bar_file(output, symbol, minute_level, store_format)
+    last_timestamp = read_last_timestamp(filename) if incremental else None
+    outputsize = choose_outputsize(last_timestamp, minute_level)
+    logger.info(f"Fetching {minute_level} ({interval}, {outputsize}) data for {symbol} from Alpha Vantage...")
+    
+    if minute_level == '1_day':
+        df = await api_client.fetch_daily_data(symbol, outputsize)
+    else:
+        df = await api_client.fetch_intraday_data(symbol, interval, outputsize)
+    
+    # Fall back to a full download when the compact window misses the gap
+    if outputsize == 'compact' and not gap_covered(df, last_timestamp):
+        logger.info(f"Compact data for {symbol} {minute_level} does not cover the gap since {last_timestamp}, fetching full history")
+        if minute_level == '1_day':
+            df = await api_client.fetch_daily_data(symbol)
+        else:
+            df = await api_client.fetch_intraday_data(symbol, interval)
+    
+    if df is None or df.empty:
+        logger.warning(f"No data fetched for {symbol} {minute_level} interval")
+        return False
+    
+    os.makedirs(symbol_output_dir, exist_ok=True)
+    
+    # Write the file off the event loop so other responses keep flowing
+    rows = await asyncio.get_running_loop().run_in_executor(None, save_bars, df, filename, last_timestamp)
+    logger.info(f"Saved {rows} rows to {filename}")
+    return True
+
+async def _fetch_all_async(api_key, symbols, minute_levels, output, concurrency, incremental=False, store_format='csv'):
+    """Run every (symbol, minute level) request concurrently under one rate budget"""
+    from client.async_api_client import AsyncAPIClient
+    
+    async with AsyncAPIClient(api_key, concurrency=concurrency) as api_client:
+        tasks = [
+            _fetch_and_save_async(api_client, symbol, minute_level, output, incremental, store_format)
+            for symbol in symbols
+            for minute_level in minute_levels
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    failed = 0
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"Async fetch task failed: {str(result)}")
+        if result is not True:
+            failed += 1
+    return len(results) - failed, failed
+
+def fetch_all_stocks_data_async(api_key, output='./output', symbols=None, concurrency=10, incremental=False, store_format='csv'):
+    """
+    Fetch stock data for all symbols concurrently with aiohttp.
+    
+    All (symbol, minute level) requests are scheduled at once and share the
+    process-wide rate limiter, so wall time is bounded by the API quota
+    rather than by serial round trips.
+    """
+    try:
+        # Load symbols configuration unless an explicit list was given
+        if not symbols:
+            symbols_config = load_symbols_config()
+            if not symbols_config:
+                logger.error("Failed to load symbols configuration")
+                return
+            symbols = get_symbols(symbols_config)
+        if not symbols:
+            logger.error("No symbols found in configuration")
+            return
+        
+        # Load minute levels from configuration
+        config = load_factors_config()
+        if not config:
+            logger.error("Failed to load factors configuration")
+            return
+        minute_levels = [level for level in get_minute_levels(config) if level in INTERVAL_MAPPING]
+        if not minute_levels:
+            logger.error("No minute levels found in configuration")
+            return
+        
+        os.makedirs(output, exist_ok=True)
+        
+        succeeded, failed = asyncio.run(
+            _fetch_all_async(api_key, symbols, minute_levels, output, concurrency, incremental, store_format)
+        )
+        logger.info(f"Async data fetching completed: {succeeded} succeeded, {failed} failed")
+        
+    except Exception as e:
+        logger.error(f"An error occurred while fetching data asynchronously: {str(e)}", exc_info=True)
+        raise
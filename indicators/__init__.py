@@ -1 +1,135 @@
-"""Indicators module for Caesar Quantitative Analysis System"""
\ No newline at end of file
+"""Indicators module for Caesar Quantitative Analysis System"""
+import pandas as pd
+
+from indicators.macd import calculate_macd, plot_macd
+from indicators.boll import calculate_boll, plot_boll
+from indicators.rsi import RSI_METHODS, calculate_rsi, plot_rsi
+from indicators.streaming import MACDState, BollState, RSIState
+from indicators.panel import calculate_macd_panel, calculate_boll_panel, calculate_rsi_panel
+
+class Indicator:
+    """
+    Declaration of one indicator: what it reads, how it is parameterised and what it produces.
+
+    Drivers (the calculate pipeline, caches, the API) only go through this
+    description, so a new indicator becomes available everywhere once it is
+    registered with register_indicator().
+
+    Attributes:
+        name: Registry key, also used in output paths (e.g. 'macd')
+        calculate: calculate(df, **params) -> DataFrame of outputs indexed like df
+        plot: plot(df, result_df, symbol, time_level, output_dir), or None
+        inputs: Bar columns calculate() reads (e.g. ['close'])
+        params: Parameter names and their default values
+        outputs: Output column names of calculate()
+        warmup: Number of leading bars before outputs are meaningful, as an
+            int or a function of the resolved params
+        state: Streaming state class built as state(**params), or from past
+            bars as state.from_history(df, **params); None if not streamable
+        version: Bumped whenever the calculation changes its results
+        choices: Allowed values for parameters that take one of a fixed set
+        panel: panel(wide, **params) calculating many symbols at once from a
+            (time x symbols) frame or array of the single input column; returns
+            (field, symbol) columns, or {field: 2-D array} for array input;
+            None if only calculate() is available
+    """
+
+    def __init__(self, name: str, calculate, plot, inputs: list, params: dict, outputs: list, warmup,
+                 state=None, version: str = '1', choices: dict = None, panel=None):
+        self.name = name
+        self.calculate = calculate
+        self.plot = plot
+        self.inputs = list(inputs)
+        self.params = dict(params)
+        self.outputs = list(outputs)
+        self.warmup = warmup
+        self.state = state
+        self.version = version
+        self.choices = dict(choices or {})
+        self.panel = panel
+
+    def resolve_params(self, overrides: dict = None) -> dict:
+        """
+        Merge overrides into the defaults, converting each value to its default's type.
+
+        Raises:
+            ValueError: For unknown parameter names or values outside the allowed choices
+        """
+        params = dict(self.params)
+        for key, value in (overrides or {}).items():
+            if key not in self.params:
+                raise ValueError(f"Unknown parameter '{key}' for {self.name}, choose from: {', '.join(self.params)}")
+            default = self.params[key]
+            if isinstance(value, str) and not isinstance(default, str):
+                try:
+                    value = type(default)(value)
+                except ValueError:
+                    raise ValueError(f"Invalid {self.name} {key} '{value}', expected {type(default).__name__}")
+            if key in self.choices and value not in self.choices[key]:
+                raise ValueError(f"Invalid {self.name} {key} '{value}', choose from: {', '.join(map(str, self.choices[key]))}")
+            params[key] = value
+        return params
+
+    def warmup_bars(self, params: dict = None) -> int:
+        """Return the warm-up length for the given parameters"""
+        params = self.resolve_params(params)
+        return self.warmup(params) if callable(self.warmup) else self.warmup
+
+    def compute(self, df: pd.DataFrame, params: dict = None) -> pd.DataFrame:
+        """Calculate the indicator on df with defaults updated by params"""
+        return self.calculate(df, **self.resolve_params(params))
+
+    def new_state(self, params: dict = None):
+        """Create an empty streaming state for the given parameters"""
+        if self.state is None:
+            raise ValueError(f"{self.name} has no streaming state")
+        return self.state(**self.resolve_params(params))
+
+    def __repr__(self) -> str:
+        return f"Indicator({self.name!r}, params={self.params}, version={self.version!r})"
+
+# Indicator name -> Indicator, in registration order
+INDICATORS = {}
+
+def register_indicator(indicator: Indicator) -> Indicator:
+    """Add an indicator to the registry (replacing any with the same name) and return it"""
+    INDICATORS[indicator.name] = indicator
+    return indicator
+
+def get_indicator(name: str) -> Indicator:
+    """Look up a registered indicator by name"""
+    if name not in INDICATORS:
+        raise ValueError(f"Unknown indicator '{name}', choose from: {', '.join(INDICATORS)}")
+    return INDICATORS[name]
+
+register_indicator(Indicator(
+    'macd', calculate_macd, plot_macd,
+    inputs=['close'],
+    params={'fast_period': 12, 'slow_period': 26, 'signal_period': 9},
+    outputs=['DIFF', 'DEA', 'BAR'],
+    # EMAs have infinite memory; slow + signal bars is the usual settling length
+    warmup=lambda p: p['slow_period'] + p['signal_period'],
+    state=MACDState,
+    panel=calculate_macd_panel
+))
+
+register_indicator(Indicator(
+    'boll', calculate_boll, plot_boll,
+    inputs=['close'],
+    params={'period': 20, 'std_multiplier': 2.0},
+    outputs=['MIDDLE', 'UPPER', 'LOWER'],
+    warmup=lambda p: p['period'] - 1,
+    state=BollState,
+    panel=calculate_boll_panel
+))
+
+register_indicator(Indicator(
+    'rsi', calculate_rsi, plot_rsi,
+    inputs=['close'],
+    params={'period': 14, 'method': 'sma'},
+    outputs=['RSI'],
+    warmup=lambda p: p['period'],
+    state=RSIState,
+    choices={'method': RSI_METHODS},
+    panel=calculate_rsi_panel
+))
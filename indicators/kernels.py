@@ -0,0 +1,186 @@
+"""Vectorized NumPy kernels shared by the indicator modules"""
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.signal import lfilter
+except ImportError:  # scipy is optional; fall back to pandas' compiled ewm
+    lfilter = None
+
+# Cumulative sums restart every BLOCK_SIZE rows so rounding error stays bounded
+# by the block length instead of growing with the length of the series
+BLOCK_SIZE = 4096
+
+def _block_cumsum(values: np.ndarray, block: int) -> tuple:
+    """
+    Cumulative sums along axis 0 that restart every `block` rows.
+
+    Returns:
+        (local, totals): the block-local prefix sums with values' shape, and
+        the total of each block
+    """
+    n = values.shape[0]
+    n_blocks = -(-n // block)
+    padded = np.zeros((n_blocks * block,) + values.shape[1:])
+    padded[:n] = values
+    blocks = padded.reshape((n_blocks, block) + values.shape[1:])
+    np.cumsum(blocks, axis=1, out=blocks)
+    return padded[:n], blocks[:, -1].copy()
+
+def _crossing_rows(n: int, window: int, block: int) -> np.ndarray:
+    """Rows whose window of `window` rows starts in the previous block"""
+    crossing = np.arange(block, n, block)[:, None] + np.arange(min(window, block))
+    crossing = crossing[crossing < n].ravel()
+    return crossing[crossing >= window]
+
+def _window_diff(local: np.ndarray, window: int) -> np.ndarray:
+    """local[t] - local[t - window], or local[t] before the first full window"""
+    sums = local.copy()
+    if local.shape[0] > window:
+        sums[window:] -= local[:-window]
+    return sums
+
+def _rolling_sum(values: np.ndarray, window: int, block: int) -> np.ndarray:
+    """
+    Sum of the last `window` rows at every position along axis 0.
+
+    Cumulative sums restart at each block boundary, so a window sum is a plain
+    difference of two local prefixes except for the first `window` rows of a
+    block, which add back the total of the previous block. Rows before the
+    first full window hold the running prefix sum.
+    """
+    local, totals = _block_cumsum(values, block)
+    sums = _window_diff(local, window)
+    crossing = _crossing_rows(values.shape[0], window, block)
+    sums[crossing] += totals[crossing // block - 1]
+    return sums
+
+def rolling_mean_std(values, window: int, ddof: int = 1) -> tuple:
+    """
+    Rolling mean and standard deviation in a single fused pass.
+
+    Sums of x and x^2 are accumulated with block-local cumulative sums over
+    data centred on each block's own mean, so the rounding error neither
+    grows with series length nor with how far prices drift over the series.
+    Windows that start in the previous block carry the difference between
+    the two block means into their sums. Rows whose window contains a NaN or
+    is not yet full are NaN, as with pandas rolling(window).mean()/.std().
+
+    Args:
+        values: 1-D array (time) or 2-D array (time x symbols)
+        window: Rolling window length
+        ddof: Delta degrees of freedom for the standard deviation (default: 1)
+
+    Returns:
+        (mean, std) arrays with the same shape as values
+    """
+    values = np.asarray(values, dtype='float64')
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    n = values.shape[0]
+    if n == 0:
+        return values.copy(), values.copy()
+
+    finite = np.isfinite(values)
+    all_finite = finite.all()
+    block = max(BLOCK_SIZE, window)
+    n_blocks = -(-n // block)
+    tail = values.shape[1:]
+
+    # Centre each block on the mean of its finite values
+    padded = np.zeros((n_blocks * block,) + tail)
+    padded[:n] = values if all_finite else np.where(finite, values, 0.0)
+    blocks = padded.reshape((n_blocks, block) + tail)
+    if all_finite:
+        counts = np.minimum(n - np.arange(n_blocks) * block, block).reshape((n_blocks,) + (1,) * len(tail))
+    else:
+        present = np.zeros((n_blocks * block,) + tail, dtype=bool)
+        present[:n] = finite
+        counts = np.maximum(present.reshape(blocks.shape).sum(axis=1), 1)
+    reference = blocks.sum(axis=1) / counts
+    blocks -= reference[:, None]
+    if not all_finite:
+        padded[~present] = 0.0
+    centered = padded[:n]
+
+    local1, totals1 = _block_cumsum(centered, block)
+    local2, totals2 = _block_cumsum(centered * centered, block)
+    s1 = _window_diff(local1, window)
+    s2 = _window_diff(local2, window)
+
+    # Windows that start in the previous block: shift its partial sums
+    # from the previous block's mean to this block's
+    crossing = _crossing_rows(n, window, block)
+    current = crossing // block
+    before = (current * block + window - 1 - crossing).reshape((-1,) + (1,) * len(tail))
+    shift = reference[current - 1] - reference[current]
+    partial1 = totals1[current - 1] - local1[crossing - window]
+    partial2 = totals2[current - 1] - local2[crossing - window]
+    s1[crossing] = local1[crossing] + partial1 + before * shift
+    s2[crossing] = local2[crossing] + partial2 + (2 * partial1 + before * shift) * shift
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = s1 / window
+        std = np.sqrt(np.maximum(s2 - s1 * mean, 0.0) / (window - ddof))
+    mean_blocks = np.empty((n_blocks * block,) + tail)
+    mean_blocks[:n] = mean
+    mean_blocks.reshape(blocks.shape)[...] += reference[:, None]
+    mean = mean_blocks[:n]
+
+    # Rows without a full window of finite values are NaN
+    mean[:window - 1] = np.nan
+    std[:window - 1] = np.nan
+    if window <= ddof:
+        std[:] = np.nan
+    if not all_finite:
+        full = _rolling_sum(finite.astype('float64'), window, block) > window - 0.5
+        mean[~full] = np.nan
+        std[~full] = np.nan
+    return mean, std
+
+def boll_bands(values, period: int = 20, std_multiplier: float = 2.0) -> tuple:
+    """
+    Bollinger Bands from one sweep of the rolling-moments kernel.
+
+    Args:
+        values: 1-D array (time) or 2-D array (time x symbols) of close prices
+        period: Period for moving average (default: 20)
+        std_multiplier: Standard deviation multiplier for bands (default: 2.0)
+
+    Returns:
+        (middle, upper, lower) arrays with the same shape as values
+    """
+    middle, std = rolling_mean_std(values, period)
+    return middle, middle + std * std_multiplier, middle - std * std_multiplier
+
+def ewm_filter(values, alpha: float, initial=None) -> np.ndarray:
+    """
+    First-order recursive filter y[t] = (1 - alpha) * y[t-1] + alpha * x[t] along axis 0.
+
+    Runs as one compiled recursive pass (scipy.signal.lfilter when scipy is
+    installed, otherwise pandas ewm(adjust=False)) over every column at once.
+
+    Args:
+        values: 1-D array (time) or 2-D array (time x series) without NaNs
+        alpha: Smoothing factor in (0, 1]
+        initial: Filter state before the first row (y[-1]); defaults to the
+            first row, so y[0] == x[0] as with pandas ewm(adjust=False)
+
+    Returns:
+        Filtered array with the same shape as values
+    """
+    values = np.asarray(values, dtype='float64')
+    if values.shape[0] == 0:
+        return values.copy()
+    initial = values[0] if initial is None else np.asarray(initial, dtype='float64')
+
+    if lfilter is not None:
+        zi = np.expand_dims((1 - alpha) * np.broadcast_to(initial, values.shape[1:]), 0)
+        filtered, _ = lfilter([alpha], [1.0, alpha - 1.0], values, axis=0, zi=zi)
+        return filtered
+
+    # Seed pandas with the initial state as an extra leading row
+    seeded = np.concatenate([np.expand_dims(np.broadcast_to(initial, values.shape[1:]), 0), values])
+    frame = pd.DataFrame(seeded.reshape(len(seeded), -1))
+    filtered = frame.ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+    return filtered.reshape(values.shape)
@@ -3,9 +3,10 @@ import pandas as pd
 import numpy as np
 import os
 import logging
-import matplotlib.pyplot as plt
 from typing import Optional
 
+from indicators.plotting import DEFAULT_TARGET_WIDTH, decimate, thin_markers
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -49,7 +50,7 @@ def calculate_macd(df: pd.DataFrame, fast_period: int = 12, slow_period: int = 2
         logger.error(f"Error calculating MACD: {str(e)}", exc_info=True)
         raise
 
-def plot_macd(df: pd.DataFrame, macd_df: pd.DataFrame, symbol: str, time_level: str, output_dir: str) -> None:
+def plot_macd(df: pd.DataFrame, macd_df: pd.DataFrame, symbol: str, time_level: str, output_dir: str, target_width: int = DEFAULT_TARGET_WIDTH) -> None:
     """
     Plot MACD indicator and save to file.
     
@@ -58,7 +59,11 @@ def plot_macd(df: pd.DataFrame, macd_df: pd.DataFrame, symbol: str, time_level:
         macd_df: DataFrame with MACD values
         symbol: Stock symbol
         output_dir: Output directory for plots
+        target_width: Decimate series to about this many pixels wide (None or 0 draws every bar)
     """
+    # Imported lazily so computation-only runs (--no-plot) never load Matplotlib
+    import matplotlib.pyplot as plt
+    
     try:
         # Create output directory if it doesn't exist
         if not os.path.exists(output_dir):
@@ -69,10 +74,11 @@ def plot_macd(df: pd.DataFrame, macd_df: pd.DataFrame, symbol: str, time_level:
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
         
         # Plot price data
-        ax1.plot(df.index, df['close'], label='Close Price', color='black')
+        price = decimate(df, ['close'], target_width)
+        ax1.plot(price.index, price['close'], label='Close Price', color='black')
         ax1.set_title(f'{symbol} - Price Chart')
         ax1.set_ylabel('Price')
-        ax1.legend()
+        ax1.legend(loc='upper left')
         ax1.grid(True)
         
         # Calculate crossover points
@@ -81,28 +87,30 @@ def plot_macd(df: pd.DataFrame, macd_df: pd.DataFrame, symbol: str, time_level:
         # Death cross (DIFF crosses below DEA)
         death_cross = (macd_df['DIFF'] < macd_df['DEA']) & (macd_df['DIFF'].shift(1) >= macd_df['DEA'].shift(1))
         
-        # Plot MACD lines
-        ax2.plot(macd_df.index, macd_df['DIFF'], label='DIFF', color='blue')
-        ax2.plot(macd_df.index, macd_df['DEA'], label='DEA', color='red')
+        # Plot MACD lines on the min/max decimated series
+        macd_plot = decimate(macd_df, ['DIFF', 'DEA', 'BAR'], target_width)
+        ax2.plot(macd_plot.index, macd_plot['DIFF'], label='DIFF', color='blue')
+        ax2.plot(macd_plot.index, macd_plot['DEA'], label='DEA', color='red')
         
-        # Plot histogram as bar chart
-        # Color bars based on value: green for positive, red for negative
-        positive_bars = macd_df['BAR'] >= 0
-        negative_bars = macd_df['BAR'] < 0
+        # Plot histogram as a filled area instead of one rectangle per bar
+        # Color based on value: green for positive, red for negative
+        bar_values = macd_plot['BAR'].to_numpy()
+        ax2.fill_between(macd_plot.index, 0, bar_values, where=bar_values >= 0, interpolate=True,
+                         label='BAR (Positive)', color='green', alpha=0.6)
+        ax2.fill_between(macd_plot.index, 0, bar_values, where=bar_values < 0, interpolate=True,
+                         label='BAR (Negative)', color='red', alpha=0.6)
         
-        ax2.bar(macd_df.index[positive_bars], macd_df['BAR'][positive_bars], 
-                label='BAR (Positive)', color='green', alpha=0.6)
-        ax2.bar(macd_df.index[negative_bars], macd_df['BAR'][negative_bars], 
-                label='BAR (Negative)', color='red', alpha=0.6)
+        # Cap the number of crossover markers so dense charts stay readable
+        max_markers = target_width // 40 if target_width else None
         
         # Mark golden crosses
-        golden_points = macd_df[golden_cross]
+        golden_points = thin_markers(macd_df[golden_cross], max_markers)
         if not golden_points.empty:
             ax2.scatter(golden_points.index, golden_points['DIFF'], 
                        marker='^', color='gold', s=100, label='Golden Cross', zorder=5)
         
         # Mark death crosses
-        death_points = macd_df[death_cross]
+        death_points = thin_markers(macd_df[death_cross], max_markers)
         if not death_points.empty:
             ax2.scatter(death_points.index, death_points['DIFF'], 
                        marker='v', color='purple', s=100, label='Death Cross', zorder=5)
@@ -110,7 +118,7 @@ def plot_macd(df: pd.DataFrame, macd_df: pd.DataFrame, symbol: str, time_level:
         ax2.set_title(f'{symbol} - MACD Indicator')
         ax2.set_xlabel('Date')
         ax2.set_ylabel('MACD Value')
-        ax2.legend()
+        ax2.legend(loc='upper left')
         ax2.grid(True)
         
         # Save plot
@@ -134,45 +142,8 @@ def calculate_and_save_macd(symbol: str, time_level: str, data_dir: str = './out
         data_dir: Directory containing stock data CSV files
         output_dir: Base output directory for MACD results
     """
-    try:
-        # Create symbol-specific output directory with time level
-        symbol_output_dir = os.path.join(output_dir, symbol, 'indicators', 'macd', time_level)
-        
-        # Read stock data
-        data_file = os.path.join(data_dir, symbol, f'{symbol}_{time_level}.csv')
-        if not os.path.exists(data_file):
-            logger.warning(f"Data file not found: {data_file}")
-            return
-        
-        df = pd.read_csv(data_file)
-        
-        # Convert timestamp column to datetime if it exists
-        timestamp_cols = [col for col in df.columns if 'time' in col.lower() or 'date' in col.lower()]
-        if timestamp_cols:
-            df[timestamp_cols[0]] = pd.to_datetime(df[timestamp_cols[0]])
-            df.set_index(timestamp_cols[0], inplace=True)
-        
-        # Calculate MACD
-        macd_df = calculate_macd(df)
-        
-        # Save MACD to CSV
-        if not os.path.exists(symbol_output_dir):
-            os.makedirs(symbol_output_dir)
-            logger.info(f"Created symbol directory: {symbol_output_dir}")
-        
-        csv_filename = os.path.join(symbol_output_dir, f'{symbol}_{time_level}_macd.csv')
-        
-        # Check if CSV file already exists
-        if os.path.exists(csv_filename):
-            logger.info(f"MACD data already exists for {symbol} {time_level}, skipping calculation")
-            return
-        
-        macd_df.to_csv(csv_filename)
-        logger.info(f"Saved MACD data to {csv_filename}")
-        
-        # Plot MACD
-        plot_macd(df, macd_df, symbol, time_level, symbol_output_dir)
-        
-    except Exception as e:
-        logger.error(f"Error calculating and saving MACD for {symbol} {time_level}: {str(e)}", exc_info=True)
-        raise
\ No newline at end of file
+    # Delegate to the shared single-load pipeline
+    from indicators.pipeline import calculate_and_save_indicators
+    errors = calculate_and_save_indicators(symbol, time_level, ['macd'], data_dir, output_dir)
+    if 'macd' in errors:
+        raise errors['macd']
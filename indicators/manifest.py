@@ -0,0 +1,106 @@
+"""Output manifests: decide whether a saved indicator is up to date without loading any bars"""
+import os
+import json
+import logging
+
+from data.bar_store import bar_file_stat
+
+logger = logging.getLogger(__name__)
+
+# Bumped if the manifest layout changes; older manifests are treated as stale
+MANIFEST_VERSION = 1
+
+def manifest_file(output_file: str) -> str:
+    """Return the manifest path stored next to an indicator output file"""
+    return f'{os.path.splitext(output_file)[0]}.manifest.json'
+
+def input_version(bar_path: str) -> dict:
+    """
+    Describe the current version of a bar file by path, size and mtime (one stat).
+
+    Take this before loading the bars, so a file rewritten during the
+    calculation is seen as changed on the next run.
+    """
+    version = {'path': os.path.abspath(bar_path)}
+    version.update(bar_file_stat(bar_path))
+    return version
+
+def read_manifest(output_file: str):
+    """Return the manifest of an output file, or None if it is missing or unreadable"""
+    path = manifest_file(output_file)
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable manifest {path}: {str(e)}")
+        return None
+    if manifest.get('manifest_version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+def _dump_manifest(output_file: str, manifest: dict) -> None:
+    """Write a manifest under a temporary name and move it into place"""
+    path = manifest_file(output_file)
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+def write_manifest(output_file: str, indicator, params: dict, source: dict, rows: int, **extra) -> dict:
+    """
+    Atomically record what an output file was calculated from.
+
+    Write it only after the output itself has been saved, so an interrupted
+    run never leaves a partial output marked as up to date.
+
+    Args:
+        output_file: Path of the saved indicator output
+        indicator: The Indicator that produced it
+        params: Resolved parameters it was calculated with
+        source: input_version() of the bar file it was calculated from
+        rows: Number of rows written
+        extra: Additional fields to store alongside
+    """
+    manifest = {
+        'manifest_version': MANIFEST_VERSION,
+        'indicator': indicator.name,
+        'version': indicator.version,
+        'params': params,
+        'input': source,
+        'rows': rows
+    }
+    manifest.update(extra)
+    _dump_manifest(output_file, manifest)
+    return manifest
+
+def is_up_to_date(output_file: str, indicator, params: dict, bar_path: str) -> bool:
+    """
+    Check whether an output matches the current code, parameters and bars.
+
+    This costs reading the manifest and one stat of the bar file. A file
+    that was only touched counts as changed; the pipeline then resumes the
+    output, which re-reads just the last few rows to confirm nothing changed.
+
+    Args:
+        output_file: Path of the indicator output
+        indicator: The Indicator that produces it
+        params: Resolved parameters of the requested calculation
+        bar_path: The bar file the output would be calculated from now
+            (find_bar_file()); None if no bars are stored
+    """
+    manifest = read_manifest(output_file)
+    if manifest is None or bar_path is None or not os.path.exists(output_file):
+        return False
+    if manifest.get('version') != indicator.version or manifest.get('params') != params:
+        return False
+
+    source = manifest.get('input') or {}
+    # Another format written or migrated since supersedes the recorded file
+    if source.get('path') != os.path.abspath(bar_path):
+        return False
+    try:
+        stat = bar_file_stat(bar_path)
+    except (ValueError, OSError):
+        return False
+    return stat['size'] == source.get('size') and stat['mtime_ns'] == source.get('mtime_ns')
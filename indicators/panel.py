@@ -0,0 +1,174 @@
+"""Panel indicators: compute MACD/BOLL/RSI for many symbols in one vectorized call"""
+import logging
+import numpy as np
+import pandas as pd
+
+from data.bar_store import load_bars
+from indicators.kernels import boll_bands
+from indicators.rsi import RSI_METHODS, _smoothed_averages
+
+logger = logging.getLogger(__name__)
+
+def load_panel(symbols: list, time_level: str, data_dir: str = './output', column: str = 'close') -> pd.DataFrame:
+    """
+    Load one column for many symbols as a wide, timestamp-aligned DataFrame.
+
+    Args:
+        symbols: Stock symbols (missing ones are skipped with a warning)
+        time_level: Time level (e.g., '1_minute', '5_minute', '1_day')
+        data_dir: Directory containing stock data files
+        column: Bar column to load (default: 'close')
+
+    Returns:
+        DataFrame indexed by timestamp with one column per symbol; rows a
+        symbol did not trade are NaN. The calculate_*_panel functions treat
+        those rows as absent, so each symbol's result on its own bars equals
+        the single-symbol functions.
+    """
+    series = {}
+    for symbol in symbols:
+        df = load_bars(symbol, time_level, data_dir, columns=[column])
+        if df is None:
+            logger.warning(f"Data file not found for {symbol} {time_level} in {data_dir}")
+            continue
+        series[symbol] = df[column]
+    if not series:
+        return pd.DataFrame()
+    return pd.concat(series, axis=1).sort_index()
+
+def _as_array(close):
+    """Split a wide DataFrame or 2-D array into (values, index, columns)"""
+    if isinstance(close, pd.DataFrame):
+        return close.to_numpy(dtype='float64'), close.index, close.columns
+    values = np.asarray(close, dtype='float64')
+    if values.ndim == 1:
+        values = values[:, None]
+    if values.ndim != 2:
+        raise ValueError("Panel input must be a 2-D (time x symbols) array or a wide DataFrame")
+    return values, None, None
+
+def _wrap(outputs: dict, index, columns):
+    """Return a (field, symbol) column DataFrame for DataFrame input, else the dict of arrays"""
+    if index is None:
+        return outputs
+    return pd.concat({field: pd.DataFrame(values, index=index, columns=columns) for field, values in outputs.items()}, axis=1)
+
+def _by_calendar(values: np.ndarray, func) -> list:
+    """
+    Apply func to each group of columns that have values on the same rows.
+
+    A NaN row in a column is treated as absent for that symbol, as when
+    load_panel() aligns a symbol that did not trade at some timestamp, or was
+    listed later than others. Each group is calculated on its own rows only
+    (still one vectorized call per group), so every column gets the same
+    result as the single-symbol functions on its own bars; absent rows are NaN.
+
+    Returns:
+        List of output arrays (one per func output) with values' shape, or
+        None if no column has any values
+    """
+    valid = ~np.isnan(values)
+    calendars = {}
+    for j, key in enumerate(np.packbits(valid, axis=0).T):
+        calendars.setdefault(key.tobytes(), []).append(j)
+
+    outputs = None
+    for cols in calendars.values():
+        rows = valid[:, cols[0]]
+        if not rows.any():
+            continue
+        if rows.all():
+            results = func(values[:, cols])
+        else:
+            results = func(values[rows][:, cols])
+        if outputs is None:
+            outputs = [np.full(values.shape, np.nan) for _ in results]
+        for output, result in zip(outputs, results):
+            if rows.all():
+                output[:, cols] = result
+            else:
+                output[np.ix_(rows, cols)] = result
+    return outputs
+
+def calculate_macd_panel(close, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+    """
+    Calculate MACD for every column of a (time x symbols) panel.
+
+    Args:
+        close: Wide DataFrame or 2-D array of close prices, one column per symbol
+        fast_period: Fast EMA period (default: 12)
+        slow_period: Slow EMA period (default: 26)
+        signal_period: Signal line EMA period (default: 9)
+
+    Returns:
+        For DataFrame input, a DataFrame with (field, symbol) columns where
+        field is DIFF, DEA or BAR; for array input, a dict of 2-D arrays
+    """
+    values, index, columns = _as_array(close)
+
+    def macd_block(block):
+        frame = pd.DataFrame(block)
+        macd_line = frame.ewm(span=fast_period, adjust=False).mean() - frame.ewm(span=slow_period, adjust=False).mean()
+        signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
+        return macd_line.to_numpy(), signal_line.to_numpy(), (macd_line - signal_line).to_numpy()
+
+    outputs = _by_calendar(values, macd_block) or [np.full(values.shape, np.nan)] * 3
+    return _wrap(dict(zip(('DIFF', 'DEA', 'BAR'), outputs)), index, columns)
+
+def calculate_boll_panel(close, period: int = 20, std_multiplier: float = 2.0):
+    """
+    Calculate BOLL for every column of a (time x symbols) panel.
+
+    Args:
+        close: Wide DataFrame or 2-D array of close prices, one column per symbol
+        period: Period for moving average (default: 20)
+        std_multiplier: Standard deviation multiplier for bands (default: 2.0)
+
+    Returns:
+        For DataFrame input, a DataFrame with (field, symbol) columns where
+        field is MIDDLE, UPPER or LOWER; for array input, a dict of 2-D arrays
+    """
+    values, index, columns = _as_array(close)
+    outputs = _by_calendar(values, lambda block: boll_bands(block, period, std_multiplier))
+    middle, upper, lower = outputs or [np.full(values.shape, np.nan)] * 3
+    return _wrap({'MIDDLE': middle, 'UPPER': upper, 'LOWER': lower}, index, columns)
+
+def _rsi_block(values: np.ndarray, period: int, method: str) -> tuple:
+    """RSI for a block of columns that all start on the first row"""
+    delta = np.diff(values, axis=0, prepend=np.nan)
+    with np.errstate(invalid='ignore'):
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+
+    if method == 'sma':
+        avg_gain = pd.DataFrame(gain).rolling(window=period, min_periods=1).mean().to_numpy()
+        avg_loss = pd.DataFrame(loss).rolling(window=period, min_periods=1).mean().to_numpy()
+    else:
+        k = gain.shape[1]
+        # Smooth gains and losses of every column in one recursive filter pass
+        averages = _smoothed_averages(gain, loss, period, method)
+        avg_gain, avg_loss = averages[:, :k], averages[:, k:]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    return (rsi,)
+
+def calculate_rsi_panel(close, period: int = 14, method: str = 'sma'):
+    """
+    Calculate RSI for every column of a (time x symbols) panel.
+
+    Args:
+        close: Wide DataFrame or 2-D array of close prices, one column per symbol
+        period: Period for RSI calculation (default: 14)
+        method: 'sma', 'wilder' or 'ema' (see calculate_rsi)
+
+    Returns:
+        For DataFrame input, a DataFrame with (field, symbol) columns where
+        field is RSI; for array input, a dict with one 2-D array
+    """
+    if method not in RSI_METHODS:
+        raise ValueError(f"Unknown RSI method '{method}', choose from: {', '.join(RSI_METHODS)}")
+    values, index, columns = _as_array(close)
+    outputs = _by_calendar(values, lambda block: _rsi_block(block, period, method))
+    rsi = outputs[0] if outputs else np.full(values.shape, np.nan)
+    return _wrap({'RSI': rsi}, index, columns)
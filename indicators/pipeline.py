@@ -0,0 +1,416 @@
+"""Multi-indicator calculation pipeline: load each (symbol, time level) once"""
+import os
+import json
+import time
+import hashlib
+import logging
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from cache.manager import get_cache_manager
+from data.bar_store import find_bar_file, read_bar_tail
+from indicators import INDICATORS, get_indicator
+from indicators.manifest import input_version, is_up_to_date, read_manifest, write_manifest
+from indicators.streaming import save_state, load_state
+
+logger = logging.getLogger(__name__)
+
+def parse_indicators(value: str) -> list:
+    """
+    Parse an --indicator argument into a list of indicator names.
+
+    Args:
+        value: 'all', a single indicator name or a comma separated list
+
+    Returns:
+        De-duplicated indicator names in the order given
+    """
+    if value.strip().lower() == 'all':
+        return list(INDICATORS)
+
+    names = []
+    for name in value.split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator '{name}', choose from: all, {', '.join(INDICATORS)}")
+        if name not in names:
+            names.append(name)
+    if not names:
+        raise ValueError("No indicator given")
+    return names
+
+def parse_params(values: list) -> dict:
+    """
+    Parse --param arguments into per-indicator parameter overrides.
+
+    Args:
+        values: Strings of the form 'indicator.name=value' (e.g. 'rsi.method=wilder')
+
+    Returns:
+        Dict mapping indicator name to its validated, typed overrides
+    """
+    params = {}
+    for value in values or []:
+        key, sep, raw = value.partition('=')
+        indicator, dot, name = key.strip().lower().partition('.')
+        if not sep or not dot:
+            raise ValueError(f"Invalid parameter '{value}', expected indicator.name=value")
+        params.setdefault(indicator, {})[name.strip()] = raw.strip()
+    return {indicator: get_indicator(indicator).resolve_params(overrides)
+            for indicator, overrides in params.items()}
+
+def indicator_output_dir(output_dir: str, symbol: str, indicator: str, time_level: str) -> str:
+    """Return the directory holding one indicator's CSV and plot for (symbol, time level)"""
+    return os.path.join(output_dir, symbol, 'indicators', indicator, time_level)
+
+def indicator_csv_file(output_dir: str, symbol: str, indicator: str, time_level: str) -> str:
+    """Return the path of one indicator's CSV for (symbol, time level)"""
+    return os.path.join(indicator_output_dir(output_dir, symbol, indicator, time_level),
+                        f'{symbol}_{time_level}_{indicator}.csv')
+
+def indicator_state_file(output_dir: str, symbol: str, indicator: str, time_level: str) -> str:
+    """Return the path of the streaming state snapshot taken at the end of an indicator's CSV"""
+    return f'{os.path.splitext(indicator_csv_file(output_dir, symbol, indicator, time_level))[0]}.state.json'
+
+def read_indicator_csv(csv_filename: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Read a saved indicator CSV, reusing the bars' index when the rows line up"""
+    result_df = pd.read_csv(csv_filename, index_col=0)
+    # Results are row-aligned with the bars they were calculated from
+    if len(result_df) == len(df):
+        result_df.index = df.index
+    else:
+        result_df.index = pd.to_datetime(result_df.index)
+    return result_df
+
+# Bars before the appended ones that are re-read and compared on resume
+TAIL_ROWS = 16
+
+def _bars_digest(df: pd.DataFrame, inputs: list) -> str:
+    """Hash the timestamps and input columns of df"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(df.index.asi8).tobytes())
+    for column in inputs:
+        digest.update(np.ascontiguousarray(df[column].to_numpy(dtype='float64')).tobytes())
+    return digest.hexdigest()
+
+def _resume_candidate(spec, params: dict, csv_filename: str, state_file: str, source: dict):
+    """
+    Return (manifest, state) if an output may be resumed, checking everything that needs no bars.
+
+    The manifest must match the code version and params and name the current
+    bar file, which must not have shrunk; the CSV must be exactly as the
+    manifest left it; and a state snapshot taken at its last row must exist.
+    """
+    manifest = read_manifest(csv_filename)
+    if manifest is None or manifest.get('version') != spec.version or manifest.get('params') != params:
+        return None
+    recorded = manifest.get('input') or {}
+    if not manifest.get('rows') or not manifest.get('tail_hash') or recorded.get('path') != source['path']:
+        return None
+    if source['size'] < recorded.get('size', 0):
+        return None
+    # A run interrupted after appending leaves the CSV longer than recorded
+    if not os.path.exists(csv_filename) or os.path.getsize(csv_filename) != manifest.get('output_size'):
+        return None
+    state = load_state(state_file)
+    if state is None or state.count != manifest['rows']:
+        return None
+    return manifest, state
+
+def _resume(spec, manifest: dict, state, bars: pd.DataFrame, first_row: int):
+    """
+    Return (indicator rows for the bars appended since the last run, state), or None.
+
+    bars holds the current bar file from row first_row on. The last
+    manifest['tail_rows'] bars the state has seen are hashed and compared
+    with the manifest, which catches rewritten files without re-reading
+    their whole history.
+    """
+    end = manifest['rows'] - first_row
+    start = end - manifest.get('tail_rows', 0)
+    if start < 0 or end > len(bars):
+        return None
+    if _bars_digest(bars.iloc[start:end], spec.inputs) != manifest['tail_hash']:
+        return None
+
+    tail = bars.iloc[end:]
+    records = [state.update(bar) for bar in tail[spec.inputs].to_dict('records')]
+    return pd.DataFrame(records, index=tail.index, columns=spec.outputs), state
+
+def calculate_and_save_indicators(symbol: str, time_level: str, indicators: list, data_dir: str = './output', output_dir: str = './output', plot: bool = True, params: dict = None, force: bool = False) -> dict:
+    """
+    Calculate several indicators for one symbol and time level from a single load.
+
+    The bars are read once, limited to the union of the indicators' declared
+    inputs, and every requested indicator is computed on the shared frame,
+    then each result is saved to CSV and, unless plot is False, plotted.
+    Charts skipped here can be produced later with render_indicators().
+
+    An output is skipped when its manifest shows it was calculated from the
+    current bars with the same parameters and indicator version; that check
+    happens before any bars are loaded. When bars were only appended since,
+    the streaming state saved with the output is resumed over the new bars
+    and their rows are appended to the CSV instead of recalculating it; if
+    nothing has to be recalculated or plotted, only the new bars and the
+    last few before them are read, so the cost follows the size of the
+    append rather than of the history.
+
+    Args:
+        symbol: Stock symbol
+        time_level: Time level (e.g., '1_minute', '5_minute', '1_day')
+        indicators: Indicator names (see INDICATORS)
+        data_dir: Directory containing stock data files
+        output_dir: Base output directory for indicator results
+        plot: Whether to render each chart right after computing it
+        params: Optional dict mapping indicator name to parameter overrides
+        force: Recalculate every output from scratch, even if up to date
+
+    Returns:
+        Dict mapping each indicator that failed to its exception
+    """
+    resolved = {indicator: get_indicator(indicator).resolve_params((params or {}).get(indicator))
+                for indicator in indicators}
+    bar_path = find_bar_file(data_dir, symbol, time_level)
+    if bar_path is None:
+        logger.warning(f"Data file not found for {symbol} {time_level} in {data_dir}")
+        return {}
+
+    # Skip up-to-date outputs before touching the bars
+    pending = []
+    for indicator in indicators:
+        csv_filename = indicator_csv_file(output_dir, symbol, indicator, time_level)
+        if not force and is_up_to_date(csv_filename, get_indicator(indicator), resolved[indicator], bar_path):
+            logger.info(f"{indicator.upper()} data is up to date for {symbol} {time_level}, skipping calculation")
+        else:
+            pending.append(indicator)
+    if not pending:
+        return {}
+
+    source = input_version(bar_path)
+    columns = sorted({column for indicator in pending for column in get_indicator(indicator).inputs})
+    candidates = {}
+    if not force:
+        for indicator in pending:
+            spec = get_indicator(indicator)
+            if spec.state is not None:
+                candidate = _resume_candidate(spec, resolved[indicator],
+                                              indicator_csv_file(output_dir, symbol, indicator, time_level),
+                                              indicator_state_file(output_dir, symbol, indicator, time_level), source)
+                if candidate is not None:
+                    candidates[indicator] = candidate
+
+    history = None
+
+    def full_history():
+        # Read only the columns the indicators declare, indexed by timestamp, through
+        # the frame cache (memory-mapped with no copy when stored as .npy columns)
+        nonlocal history
+        if history is None:
+            history = get_cache_manager().read_bars(bar_path, columns=columns)
+        return history
+
+    # When every output only needs appending and nothing is plotted, read just
+    # the new bars and the few before them that the resume check compares
+    bars, first_row = None, 0
+    if candidates and len(candidates) == len(pending) and not (plot and any(get_indicator(i).plot for i in pending)):
+        oldest, _ = min(candidates.values(), key=lambda candidate: candidate[0]['rows'])
+        bars = read_bar_tail(bar_path, oldest['rows'], oldest['input']['size'], oldest['tail_rows'], columns)
+        first_row = oldest['rows'] - oldest['tail_rows']
+    if bars is None:
+        bars, first_row = full_history(), 0
+
+    errors = {}
+    for indicator in pending:
+        spec = get_indicator(indicator)
+        try:
+            symbol_output_dir = indicator_output_dir(output_dir, symbol, indicator, time_level)
+            if not os.path.exists(symbol_output_dir):
+                os.makedirs(symbol_output_dir)
+                logger.info(f"Created symbol directory: {symbol_output_dir}")
+
+            csv_filename = indicator_csv_file(output_dir, symbol, indicator, time_level)
+            state_file = indicator_state_file(output_dir, symbol, indicator, time_level)
+            resumed = None
+            if indicator in candidates:
+                resumed = _resume(spec, *candidates[indicator], bars, first_row)
+
+            if resumed is not None:
+                tail_df, state = resumed
+                tail_df.to_csv(csv_filename, mode='a', header=False)
+                logger.info(f"Appended {len(tail_df)} {indicator.upper()} rows to {csv_filename}")
+                df, rows = bars, first_row + len(bars)
+                result_df = read_indicator_csv(csv_filename, df) if plot and spec.plot is not None else None
+            else:
+                df = full_history()
+                rows = len(df)
+                result_df = spec.compute(df, resolved[indicator])
+                result_df.to_csv(csv_filename)
+                logger.info(f"Saved {indicator.upper()} data to {csv_filename}")
+                state = spec.state.from_history(df, **resolved[indicator]) if spec.state is not None else None
+
+            if plot and spec.plot is not None:
+                spec.plot(df, result_df, symbol, time_level, symbol_output_dir)
+
+            if state is not None:
+                save_state(state, state_file)
+            tail_rows = min(TAIL_ROWS, rows)
+            write_manifest(csv_filename, spec, resolved[indicator], source, rows,
+                           output_size=os.path.getsize(csv_filename), tail_rows=tail_rows,
+                           tail_hash=_bars_digest(df.iloc[len(df) - tail_rows:], spec.inputs))
+        except Exception as e:
+            logger.error(f"Error calculating and saving {indicator.upper()} for {symbol} {time_level}: {str(e)}", exc_info=True)
+            errors[indicator] = e
+    return errors
+
+def render_indicators(symbol: str, time_level: str, indicators: list, data_dir: str = './output', output_dir: str = './output') -> dict:
+    """
+    Render charts for indicators that were already calculated and saved to CSV.
+
+    Args:
+        symbol: Stock symbol
+        time_level: Time level (e.g., '1_minute', '5_minute', '1_day')
+        indicators: Indicator names (see INDICATORS)
+        data_dir: Directory containing stock data files
+        output_dir: Base output directory holding the indicator CSVs
+
+    Returns:
+        Dict mapping each indicator that failed to its exception
+    """
+    available = [indicator for indicator in indicators
+                 if os.path.exists(indicator_csv_file(output_dir, symbol, indicator, time_level))]
+    if not available:
+        logger.warning(f"No calculated indicators to render for {symbol} {time_level}")
+        return {}
+
+    columns = sorted({column for indicator in available for column in get_indicator(indicator).inputs})
+    df = get_cache_manager().load_bars(symbol, time_level, data_dir, columns=columns)
+    if df is None:
+        logger.warning(f"Data file not found for {symbol} {time_level} in {data_dir}")
+        return {}
+
+    errors = {}
+    for indicator in available:
+        plot_indicator = get_indicator(indicator).plot
+        if plot_indicator is None:
+            continue
+        try:
+            result_df = read_indicator_csv(indicator_csv_file(output_dir, symbol, indicator, time_level), df)
+            plot_indicator(df, result_df, symbol, time_level, indicator_output_dir(output_dir, symbol, indicator, time_level))
+        except Exception as e:
+            logger.error(f"Error rendering {indicator.upper()} for {symbol} {time_level}: {str(e)}", exc_info=True)
+            errors[indicator] = e
+    return errors
+
+def _run_task(task, symbol: str, time_level: str, indicators: list, data_dir: str, output_dir: str, **kwargs) -> dict:
+    """Run one (symbol, time level) task and return its errors as strings so they pickle safely"""
+    try:
+        errors = task(symbol, time_level, indicators, data_dir, output_dir, **kwargs)
+    except Exception as e:
+        errors = {indicator: e for indicator in indicators}
+    return {indicator: str(e) for indicator, e in errors.items()}
+
+def _run_tasks(task, action: str, symbols: list, time_levels: list, indicators: list, data_dir: str, output_dir: str, workers: int, **kwargs) -> list:
+    """
+    Run task for every (symbol, time level) pair, serially or over a process pool.
+
+    Failures are printed as they arrive and never stop the remaining tasks.
+
+    Returns:
+        List of failure records (symbol, time_level, indicator, error)
+    """
+    tasks = [(symbol, time_level) for symbol in symbols for time_level in time_levels]
+    failures = []
+
+    def record(symbol, time_level, errors):
+        for indicator, error in errors.items():
+            print(f"Error {action} {indicator.upper()} for {symbol} {time_level}: {error}")
+            failures.append({'symbol': symbol, 'time_level': time_level, 'indicator': indicator, 'error': error})
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_run_task, task, symbol, time_level, indicators, data_dir, output_dir, **kwargs): (symbol, time_level)
+                for symbol, time_level in tasks
+            }
+            for future in as_completed(futures):
+                symbol, time_level = futures[future]
+                try:
+                    errors = future.result()
+                except Exception as e:
+                    # The worker itself died (e.g. killed or unpicklable result)
+                    errors = {indicator: str(e) for indicator in indicators}
+                record(symbol, time_level, errors)
+    else:
+        for symbol, time_level in tasks:
+            record(symbol, time_level, _run_task(task, symbol, time_level, indicators, data_dir, output_dir, **kwargs))
+
+    return failures
+
+def run_calculate(symbols: list, time_levels: list, indicators: list, data_dir: str = './output', output_dir: str = './output', workers: int = 1, plot: bool = True, params: dict = None, force: bool = False) -> dict:
+    """
+    Calculate indicators for every (symbol, time level) pair, optionally in parallel.
+
+    Each pair is one task so its bars are still loaded once for all requested
+    indicators. With workers > 1 the tasks are spread over a process pool.
+    Failures are printed as they arrive and never stop the remaining tasks.
+    A summary is printed and written to {output_dir}/calculate_summary.json.
+
+    Args:
+        symbols: Stock symbols
+        time_levels: Time levels (e.g., '1_minute', '5_minute', '1_day')
+        indicators: Indicator names (see INDICATORS)
+        data_dir: Directory containing stock data files
+        output_dir: Base output directory for indicator results
+        workers: Number of worker processes (1 runs serially in this process)
+        plot: Whether to render charts inline (see run_render() for a separate pass)
+        params: Optional dict mapping indicator name to parameter overrides
+        force: Recalculate even outputs whose manifest shows they are up to date
+
+    Returns:
+        Summary dict with task counts, failures and elapsed seconds
+    """
+    start = time.time()
+    failures = _run_tasks(calculate_and_save_indicators, 'calculating', symbols, time_levels, indicators,
+                          data_dir, output_dir, workers, plot=plot, params=params, force=force)
+
+    summary = {
+        'indicators': indicators,
+        'params': {indicator: get_indicator(indicator).resolve_params((params or {}).get(indicator))
+                   for indicator in indicators},
+        'tasks': len(symbols) * len(time_levels),
+        'workers': workers,
+        'plot': plot,
+        'failed_tasks': len({(f['symbol'], f['time_level']) for f in failures}),
+        'failures': failures,
+        'elapsed_seconds': round(time.time() - start, 3)
+    }
+    print(f"Calculated {', '.join(indicators)} for {summary['tasks']} (symbol, time level) tasks "
+          f"with {workers} worker(s) in {summary['elapsed_seconds']}s, {summary['failed_tasks']} failed")
+
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        summary_file = os.path.join(output_dir, 'calculate_summary.json')
+        with open(summary_file, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, indent=2)
+        logger.info(f"Saved calculate summary to {summary_file}")
+    except OSError as e:
+        logger.error(f"Error writing calculate summary: {str(e)}")
+
+    return summary
+
+def run_render(symbols: list, time_levels: list, indicators: list, data_dir: str = './output', output_dir: str = './output', workers: int = 1) -> list:
+    """
+    Render charts for already calculated indicators, optionally in parallel.
+
+    Returns:
+        List of failure records (symbol, time_level, indicator, error)
+    """
+    start = time.time()
+    failures = _run_tasks(render_indicators, 'rendering', symbols, time_levels, indicators,
+                          data_dir, output_dir, workers)
+    print(f"Rendered {', '.join(indicators)} charts for {len(symbols) * len(time_levels)} (symbol, time level) tasks "
+          f"with {workers} worker(s) in {round(time.time() - start, 3)}s, {len(failures)} failed")
+    return failures
@@ -0,0 +1,63 @@
+"""Plot helpers: min/max decimation so chart cost does not grow with bar count"""
+import numpy as np
+import pandas as pd
+
+# Charts are 12 inches wide at Matplotlib's default 100 dpi
+DEFAULT_TARGET_WIDTH = 1200
+
+def minmax_indices(values: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Select the positions of the min and max value in each of n_buckets equal buckets.
+
+    Keeping both extremes per pixel column preserves every visible spike, so
+    the decimated line is indistinguishable from the full one at that width.
+
+    Args:
+        values: 1-D array of values
+        n_buckets: Number of buckets (roughly the target width in pixels)
+
+    Returns:
+        Sorted, unique positions into values
+    """
+    n = len(values)
+    if n_buckets <= 0 or n <= 2 * n_buckets:
+        return np.arange(n)
+
+    bucket_size = int(np.ceil(n / n_buckets))
+    n_buckets = int(np.ceil(n / bucket_size))
+    padded = np.full(n_buckets * bucket_size, np.nan)
+    padded[:n] = values
+    buckets = padded.reshape(n_buckets, bucket_size)
+
+    # NaNs (including the padding) never win the min or the max
+    offsets = np.arange(n_buckets) * bucket_size
+    low = np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1) + offsets
+    high = np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1) + offsets
+    indices = np.unique(np.concatenate([low, high, [0, n - 1]]))
+    return indices[indices < n]
+
+def decimate(df: pd.DataFrame, columns: list, target_width: int = DEFAULT_TARGET_WIDTH) -> pd.DataFrame:
+    """
+    Return the rows of df needed to draw columns at target_width pixels.
+
+    The union of the min/max positions of every column is kept, so all lines
+    drawn from the result share the same x values.
+
+    Args:
+        df: DataFrame to decimate
+        columns: Columns that will be drawn
+        target_width: Target width in pixels (None or 0 disables decimation)
+    """
+    if not target_width or len(df) <= 2 * target_width:
+        return df
+
+    indices = np.unique(np.concatenate([
+        minmax_indices(df[column].to_numpy(dtype='float64'), target_width) for column in columns
+    ]))
+    return df.iloc[indices]
+
+def thin_markers(points: pd.DataFrame, max_markers: int) -> pd.DataFrame:
+    """Keep at most max_markers evenly spaced rows of points (e.g. crossover markers)"""
+    if not max_markers or len(points) <= max_markers:
+        return points
+    return points.iloc[np.linspace(0, len(points) - 1, max_markers).astype(int)]
@@ -3,24 +3,62 @@ import pandas as pd
 import numpy as np
 import os
 import logging
-import matplotlib.pyplot as plt
+
+from indicators.kernels import ewm_filter
+from indicators.plotting import DEFAULT_TARGET_WIDTH, decimate
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+# Supported averaging methods for gains and losses
+RSI_METHODS = ('sma', 'wilder', 'ema')
+
+def _smoothed_averages(gain: np.ndarray, loss: np.ndarray, period: int, method: str) -> np.ndarray:
+    """
+    Average gains and losses with a recursive filter, both series in one pass.
+    
+    Args:
+        gain: Gains per bar (the first bar, which has no change, is ignored)
+        loss: Losses per bar
+        period: Period for RSI calculation
+        method: 'wilder' (SMA seed, then alpha = 1/period) or 'ema' (alpha = 2/(period+1))
+    
+    Returns:
+        Array of shape (len(gain), 2) holding average gain and average loss
+    """
+    changes = np.column_stack([gain, loss])
+    averages = np.full(changes.shape, np.nan)
+    
+    if method == 'wilder':
+        # Wilder: the first average is the simple mean of the first `period` changes
+        if len(changes) > period:
+            seed = changes[1:period + 1].mean(axis=0)
+            averages[period] = seed
+            averages[period + 1:] = ewm_filter(changes[period + 1:], 1.0 / period, initial=seed)
+    else:
+        averages[1:] = ewm_filter(changes[1:], 2.0 / (period + 1))
+    return averages
+
+def calculate_rsi(df: pd.DataFrame, period: int = 14, method: str = 'sma') -> pd.DataFrame:
     """
     Calculate RSI indicator for given stock data.
     
     Args:
         df: DataFrame with stock data containing 'close' column
         period: Period for RSI calculation (default: 14)
+        method: How gains and losses are averaged (default: 'sma')
+            'sma': rolling simple mean over `period` bars
+            'wilder': Wilder's smoothing, the standard RSI definition
+            'ema': exponential moving average with span `period`
     
     Returns:
         DataFrame with RSI values
     """
     try:
+        if method not in RSI_METHODS:
+            raise ValueError(f"Unknown RSI method '{method}', choose from: {', '.join(RSI_METHODS)}")
+        
         # Calculate price changes
         delta = df['close'].diff()
         
@@ -29,8 +67,13 @@ def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
         loss = -delta.where(delta < 0, 0)
         
         # Calculate average gains and losses
-        avg_gain = gain.rolling(window=period, min_periods=1).mean()
-        avg_loss = loss.rolling(window=period, min_periods=1).mean()
+        if method == 'sma':
+            avg_gain = gain.rolling(window=period, min_periods=1).mean()
+            avg_loss = loss.rolling(window=period, min_periods=1).mean()
+        else:
+            averages = _smoothed_averages(gain.to_numpy(dtype='float64'), loss.to_numpy(dtype='float64'), period, method)
+            avg_gain = pd.Series(averages[:, 0], index=df.index)
+            avg_loss = pd.Series(averages[:, 1], index=df.index)
         
         # Calculate RS and RSI
         rs = avg_gain / avg_loss
@@ -46,7 +89,7 @@ def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
         logger.error(f"Error calculating RSI: {str(e)}", exc_info=True)
         raise
 
-def plot_rsi(df: pd.DataFrame, rsi_df: pd.DataFrame, symbol: str, time_level: str, output_dir: str) -> None:
+def plot_rsi(df: pd.DataFrame, rsi_df: pd.DataFrame, symbol: str, time_level: str, output_dir: str, target_width: int = DEFAULT_TARGET_WIDTH) -> None:
     """
     Plot RSI indicator and save to file.
     
@@ -56,7 +99,11 @@ def plot_rsi(df: pd.DataFrame, rsi_df: pd.DataFrame, symbol: str, time_level: st
         symbol: Stock symbol
         time_level: Time level (e.g., '1_minute', '5_minute', '1_day')
         output_dir: Output directory for plots
+        target_width: Decimate series to about this many pixels wide (None or 0 draws every bar)
     """
+    # Imported lazily so computation-only runs (--no-plot) never load Matplotlib
+    import matplotlib.pyplot as plt
+    
     try:
         # Create output directory if it doesn't exist
         if not os.path.exists(output_dir):
@@ -67,14 +114,16 @@ def plot_rsi(df: pd.DataFrame, rsi_df: pd.DataFrame, symbol: str, time_level: st
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
         
         # Plot price data
-        ax1.plot(df.index, df['close'], label='Close Price', color='black')
+        price = decimate(df, ['close'], target_width)
+        ax1.plot(price.index, price['close'], label='Close Price', color='black')
         ax1.set_title(f'{symbol} - Price Chart')
         ax1.set_ylabel('Price')
-        ax1.legend()
+        ax1.legend(loc='upper left')
         ax1.grid(True)
         
         # Plot RSI
-        ax2.plot(rsi_df.index, rsi_df['RSI'], label='RSI', color='purple')
+        rsi_plot = decimate(rsi_df, ['RSI'], target_width)
+        ax2.plot(rsi_plot.index, rsi_plot['RSI'], label='RSI', color='purple')
         
         # Add overbought and oversold lines
         ax2.axhline(y=70, color='r', linestyle='--', alpha=0.7, label='Overbought (70)')
@@ -85,7 +134,7 @@ def plot_rsi(df: pd.DataFrame, rsi_df: pd.DataFrame, symbol: str, time_level: st
         ax2.set_xlabel('Date')
         ax2.set_ylabel('RSI')
         ax2.set_ylim(0, 100)
-        ax2.legend()
+        ax2.legend(loc='upper left')
         ax2.grid(True)
         
         # Save plot
@@ -109,45 +158,8 @@ def calculate_and_save_rsi(symbol: str, time_level: str, data_dir: str = './outp
         data_dir: Directory containing stock data CSV files
         output_dir: Base output directory for RSI results
     """
-    try:
-        # Create symbol-specific output directory with time level
-        symbol_output_dir = os.path.join(output_dir, symbol, 'indicators', 'rsi', time_level)
-        
-        # Read stock data
-        data_file = os.path.join(data_dir, symbol, f'{symbol}_{time_level}.csv')
-        if not os.path.exists(data_file):
-            logger.warning(f"Data file not found: {data_file}")
-            return
-        
-        df = pd.read_csv(data_file)
-        
-        # Convert timestamp column to datetime if it exists
-        timestamp_cols = [col for col in df.columns if 'time' in col.lower() or 'date' in col.lower()]
-        if timestamp_cols:
-            df[timestamp_cols[0]] = pd.to_datetime(df[timestamp_cols[0]])
-            df.set_index(timestamp_cols[0], inplace=True)
-        
-        # Calculate RSI
-        rsi_df = calculate_rsi(df)
-        
-        # Save RSI to CSV
-        if not os.path.exists(symbol_output_dir):
-            os.makedirs(symbol_output_dir)
-            logger.info(f"Created symbol directory: {symbol_output_dir}")
-        
-        csv_filename = os.path.join(symbol_output_dir, f'{symbol}_{time_level}_rsi.csv')
-        
-        # Check if CSV file already exists
-        if os.path.exists(csv_filename):
-            logger.info(f"RSI data already exists for {symbol} {time_level}, skipping calculation")
-            return
-        
-        rsi_df.to_csv(csv_filename)
-        logger.info(f"Saved RSI data to {csv_filename}")
-        
-        # Plot RSI
-        plot_rsi(df, rsi_df, symbol, time_level, symbol_output_dir)
-        
-    except Exception as e:
-        logger.error(f"Error calculating and saving RSI for {symbol} {time_level}: {str(e)}", exc_info=True)
-        raise
\ No newline at end of file
+    # Delegate to the shared single-load pipeline
+    from indicators.pipeline import calculate_and_save_indicators
+    errors = calculate_and_save_indicators(symbol, time_level, ['rsi'], data_dir, output_dir)
+    if 'rsi' in errors:
+        raise errors['rsi']
@@ -0,0 +1,413 @@
+"""Streaming indicator state: O(1) per-bar updates that can be snapshotted to disk"""
+import os
+import json
+import math
+import logging
+from collections import deque
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+def _close(bar) -> float:
+    """Accept either a bare close price or a bar mapping/Series with a 'close' field"""
+    if isinstance(bar, (int, float)):
+        return float(bar)
+    return float(bar['close'])
+
+def _closes(history) -> np.ndarray:
+    """Accept a DataFrame with a 'close' column, a Series or an array of closes"""
+    if isinstance(history, pd.DataFrame):
+        history = history['close']
+    return np.asarray(history, dtype='float64')
+
+class EMAState:
+    """Exponential moving average matching pandas ewm(span=span, adjust=False)"""
+
+    def __init__(self, span: int):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = None
+        # Missing values seen since the last observation; like pandas
+        # (ignore_na=False) they keep decaying the weight of the old value
+        self.skipped = 0
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            if self.value is None:
+                return float('nan')
+            self.skipped += 1
+            return self.value
+        if self.value is None:
+            self.value = x
+        else:
+            old_weight = (1 - self.alpha) ** (self.skipped + 1)
+            self.value = (old_weight * self.value + self.alpha * x) / (old_weight + self.alpha)
+            self.skipped = 0
+        return self.value
+
+    def seed(self, values: np.ndarray) -> np.ndarray:
+        """
+        Set the state as if every value had been passed to update(), in one vectorized pass.
+
+        Returns:
+            The EMA at every row, as update() would have returned it
+        """
+        ema = pd.Series(values).ewm(span=self.span, adjust=False).mean().to_numpy()
+        valid = np.flatnonzero(~np.isnan(values))
+        if len(valid):
+            self.value = float(ema[-1])
+            self.skipped = len(values) - 1 - int(valid[-1])
+        return ema
+
+    def to_dict(self) -> dict:
+        return {'span': self.span, 'value': self.value, 'skipped': self.skipped}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'EMAState':
+        state = cls(data['span'])
+        state.value = data['value']
+        state.skipped = data.get('skipped', 0)
+        return state
+
+class MACDState:
+    """Incremental MACD built from three EMA states (fast, slow and signal)"""
+
+    name = 'macd'
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self.fast = EMAState(fast_period)
+        self.slow = EMAState(slow_period)
+        self.signal = EMAState(signal_period)
+        self.count = 0
+
+    def update(self, bar) -> dict:
+        """
+        Consume one bar and return its MACD values.
+
+        Args:
+            bar: Close price, or a mapping/Series with a 'close' field
+
+        Returns:
+            Dict with DIFF, DEA and BAR, as calculate_macd() would produce for this row
+        """
+        close = _close(bar)
+        diff = self.fast.update(close) - self.slow.update(close)
+        dea = self.signal.update(diff)
+        self.count += 1
+        return {'DIFF': diff, 'DEA': dea, 'BAR': diff - dea}
+
+    @classmethod
+    def from_history(cls, history, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> 'MACDState':
+        """Build the state reached after updating with every bar of history, without a Python loop"""
+        closes = _closes(history)
+        state = cls(fast_period, slow_period, signal_period)
+        diff = state.fast.seed(closes) - state.slow.seed(closes)
+        state.signal.seed(diff)
+        state.count = len(closes)
+        return state
+
+    def to_dict(self) -> dict:
+        return {
+            'type': self.name,
+            'fast': self.fast.to_dict(),
+            'slow': self.slow.to_dict(),
+            'signal': self.signal.to_dict(),
+            'count': self.count
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MACDState':
+        state = cls()
+        state.fast = EMAState.from_dict(data['fast'])
+        state.slow = EMAState.from_dict(data['slow'])
+        state.signal = EMAState.from_dict(data['signal'])
+        state.count = data['count']
+        return state
+
+class BollState:
+    """
+    Incremental Bollinger Bands over a fixed rolling window.
+
+    The window mean and sum of squared deviations are maintained with
+    Welford's add/remove updates, so each bar costs O(1) and the variance
+    does not suffer the cancellation of a naive sum-of-squares.
+    """
+
+    name = 'boll'
+
+    def __init__(self, period: int = 20, std_multiplier: float = 2.0):
+        self.period = period
+        self.std_multiplier = std_multiplier
+        self.window = deque()
+        self.n = 0
+        self.nan_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.count = 0
+
+    def _add(self, x: float) -> None:
+        self.window.append(x)
+        if math.isnan(x):
+            self.nan_count += 1
+            return
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def _remove(self, x: float) -> None:
+        if math.isnan(x):
+            self.nan_count -= 1
+            return
+        self.n -= 1
+        if self.n == 0:
+            self.mean, self.m2 = 0.0, 0.0
+            return
+        delta = x - self.mean
+        self.mean -= delta / self.n
+        self.m2 -= delta * (x - self.mean)
+
+    def update(self, bar) -> dict:
+        """
+        Consume one bar and return its bands (NaN until the window is full).
+
+        Returns:
+            Dict with MIDDLE, UPPER and LOWER, as calculate_boll() would produce for this row
+        """
+        close = _close(bar)
+        self.count += 1
+        self._add(close)
+        if len(self.window) > self.period:
+            self._remove(self.window.popleft())
+
+        # Like pandas rolling(), any NaN inside the window makes the row NaN
+        if len(self.window) < self.period or self.nan_count:
+            nan = float('nan')
+            return {'MIDDLE': nan, 'UPPER': nan, 'LOWER': nan}
+
+        std = math.sqrt(max(self.m2, 0.0) / (self.period - 1))
+        return {
+            'MIDDLE': self.mean,
+            'UPPER': self.mean + std * self.std_multiplier,
+            'LOWER': self.mean - std * self.std_multiplier
+        }
+
+    @classmethod
+    def from_history(cls, history, period: int = 20, std_multiplier: float = 2.0) -> 'BollState':
+        """Build the state reached after updating with every bar of history (only the last window matters)"""
+        closes = _closes(history)
+        state = cls(period, std_multiplier)
+        for x in closes[-period:]:
+            state._add(float(x))
+        state.count = len(closes)
+        return state
+
+    def to_dict(self) -> dict:
+        return {
+            'type': self.name,
+            'period': self.period,
+            'std_multiplier': self.std_multiplier,
+            'window': list(self.window),
+            'count': self.count
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BollState':
+        state = cls(data['period'], data['std_multiplier'])
+        # Rebuild the running moments from the window to shed accumulated rounding
+        for x in data['window']:
+            state._add(x)
+        state.count = data['count']
+        return state
+
+class RSIState:
+    """
+    Incremental RSI matching calculate_rsi() for each of its averaging methods.
+
+    'sma' keeps the rolling window of gains and losses; 'wilder' and 'ema'
+    only keep the two running averages.
+    """
+
+    name = 'rsi'
+
+    def __init__(self, period: int = 14, method: str = 'sma'):
+        if method not in ('sma', 'wilder', 'ema'):
+            raise ValueError(f"Unknown RSI method '{method}'")
+        self.period = period
+        self.method = method
+        self.prev_close = None
+        self.gains = deque()
+        self.losses = deque()
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.avg_gain = None
+        self.avg_loss = None
+        self.count = 0
+
+    def _update_sma(self, gain: float, loss: float) -> tuple:
+        self.gains.append(gain)
+        self.losses.append(loss)
+        self.gain_sum += gain
+        self.loss_sum += loss
+        if len(self.gains) > self.period:
+            self.gain_sum -= self.gains.popleft()
+            self.loss_sum -= self.losses.popleft()
+        n = len(self.gains)
+        return max(self.gain_sum, 0.0) / n, max(self.loss_sum, 0.0) / n
+
+    def _update_smoothed(self, gain: float, loss: float) -> tuple:
+        # The first bar has no change and does not enter the averages
+        changes = self.count - 1
+        if changes == 0:
+            return float('nan'), float('nan')
+
+        if self.method == 'ema':
+            if self.avg_gain is None:
+                self.avg_gain, self.avg_loss = gain, loss
+            else:
+                alpha = 2.0 / (self.period + 1)
+                self.avg_gain += alpha * (gain - self.avg_gain)
+                self.avg_loss += alpha * (loss - self.avg_loss)
+            return self.avg_gain, self.avg_loss
+
+        # Wilder: simple mean of the first `period` changes, then alpha = 1/period
+        if changes <= self.period:
+            self.gain_sum += gain
+            self.loss_sum += loss
+            if changes < self.period:
+                return float('nan'), float('nan')
+            self.avg_gain, self.avg_loss = self.gain_sum / self.period, self.loss_sum / self.period
+        else:
+            self.avg_gain += (gain - self.avg_gain) / self.period
+            self.avg_loss += (loss - self.avg_loss) / self.period
+        return self.avg_gain, self.avg_loss
+
+    def update(self, bar) -> dict:
+        """
+        Consume one bar and return its RSI.
+
+        Returns:
+            Dict with RSI, as calculate_rsi() would produce for this row
+        """
+        close = _close(bar)
+        delta = close - self.prev_close if self.prev_close is not None else float('nan')
+        self.prev_close = close
+        self.count += 1
+
+        # A bar without a change (the first one, or next to a NaN) counts as
+        # zero gain and zero loss
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        if self.method == 'sma':
+            avg_gain, avg_loss = self._update_sma(gain, loss)
+        else:
+            avg_gain, avg_loss = self._update_smoothed(gain, loss)
+
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            rsi = float('nan')
+        elif avg_loss == 0:
+            rsi = float('nan') if avg_gain == 0 else 100.0
+        else:
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        return {'RSI': rsi}
+
+    @classmethod
+    def from_history(cls, history, period: int = 14, method: str = 'sma') -> 'RSIState':
+        """Build the state reached after updating with every bar of history, without a Python loop"""
+        from indicators.rsi import _smoothed_averages
+
+        closes = _closes(history)
+        state = cls(period, method)
+        state.count = len(closes)
+        if not len(closes):
+            return state
+        state.prev_close = float(closes[-1])
+
+        delta = np.diff(closes, prepend=np.nan)
+        with np.errstate(invalid='ignore'):
+            gain = np.where(delta > 0, delta, 0.0)
+            loss = np.where(delta < 0, -delta, 0.0)
+
+        if method == 'sma':
+            state.gains = deque(gain[-period:].tolist())
+            state.losses = deque(loss[-period:].tolist())
+            state.gain_sum = math.fsum(state.gains)
+            state.loss_sum = math.fsum(state.losses)
+            return state
+
+        if method == 'wilder':
+            # Seed sums cover the first `period` changes (fewer while still warming up)
+            state.gain_sum = math.fsum(gain[1:period + 1])
+            state.loss_sum = math.fsum(loss[1:period + 1])
+        averages = _smoothed_averages(gain, loss, period, method)
+        if not np.isnan(averages[-1]).any():
+            state.avg_gain, state.avg_loss = float(averages[-1, 0]), float(averages[-1, 1])
+        return state
+
+    def to_dict(self) -> dict:
+        return {
+            'type': self.name,
+            'period': self.period,
+            'method': self.method,
+            'prev_close': self.prev_close,
+            'gains': list(self.gains),
+            'losses': list(self.losses),
+            'gain_sum': self.gain_sum,
+            'loss_sum': self.loss_sum,
+            'avg_gain': self.avg_gain,
+            'avg_loss': self.avg_loss,
+            'count': self.count
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RSIState':
+        state = cls(data['period'], data.get('method', 'sma'))
+        state.prev_close = data['prev_close']
+        state.gains = deque(data['gains'])
+        state.losses = deque(data['losses'])
+        if state.method == 'sma':
+            # Rebuild the window sums exactly to shed accumulated rounding
+            state.gain_sum = math.fsum(state.gains)
+            state.loss_sum = math.fsum(state.losses)
+        else:
+            state.gain_sum = data.get('gain_sum', 0.0)
+            state.loss_sum = data.get('loss_sum', 0.0)
+        state.avg_gain = data.get('avg_gain')
+        state.avg_loss = data.get('avg_loss')
+        state.count = data['count']
+        return state
+
+# State type name -> class, used to restore snapshots
+STATE_TYPES = {
+    MACDState.name: MACDState,
+    BollState.name: BollState,
+    RSIState.name: RSIState
+}
+
+def state_to_dict(state) -> dict:
+    """Serialize any streaming state to a JSON-compatible dict"""
+    return state.to_dict()
+
+def state_from_dict(data: dict):
+    """Restore a streaming state from state_to_dict() output"""
+    if data.get('type') not in STATE_TYPES:
+        raise ValueError(f"Unknown streaming state type: {data.get('type')}")
+    return STATE_TYPES[data['type']].from_dict(data)
+
+def save_state(state, path: str) -> None:
+    """Atomically snapshot a streaming state to a JSON file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(state_to_dict(state), file)
+    os.replace(tmp_path, path)
+
+def load_state(path: str):
+    """Restore a streaming state snapshot, or return None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as file:
+        return state_from_dict(json.load(file))
@@ -0,0 +1,98 @@
+"""Parameter sweeps: evaluate indicator grids while computing each distinct span or window once"""
+import logging
+import itertools
+import numpy as np
+import pandas as pd
+
+from indicators.kernels import rolling_mean_std
+
+logger = logging.getLogger(__name__)
+
+def _unique(values) -> list:
+    """Sorted distinct values of a scalar or iterable parameter"""
+    if np.isscalar(values):
+        values = [values]
+    return sorted(set(values))
+
+def _result_frame(values: np.ndarray, keys: list, names: list, index) -> pd.DataFrame:
+    """Wrap a filled (time x combos*fields) array with (params..., field) MultiIndex columns"""
+    columns = pd.MultiIndex.from_tuples(keys, names=names + ['field'])
+    return pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+def sweep_macd(df: pd.DataFrame, fast_periods=12, slow_periods=26, signal_periods=9) -> pd.DataFrame:
+    """
+    Calculate MACD for every combination of periods.
+
+    Each distinct fast/slow span is smoothed once and shared by all the
+    combinations that use it; the signal line of every (fast, slow) pair is
+    then computed in one 2-D pass per distinct signal span. Combinations with
+    fast_period >= slow_period are skipped.
+
+    Args:
+        df: DataFrame with stock data containing 'close' column
+        fast_periods: Fast EMA period or iterable of periods
+        slow_periods: Slow EMA period or iterable of periods
+        signal_periods: Signal line EMA period or iterable of periods
+
+    Returns:
+        DataFrame indexed like df with columns
+        (fast_period, slow_period, signal_period, field), where field is
+        DIFF, DEA or BAR as in calculate_macd()
+    """
+    fast_periods, slow_periods, signal_periods = _unique(fast_periods), _unique(slow_periods), _unique(signal_periods)
+    pairs = [(fast, slow) for fast, slow in itertools.product(fast_periods, slow_periods) if fast < slow]
+    names = ['fast_period', 'slow_period', 'signal_period']
+    if not pairs:
+        logger.warning("No MACD combination with fast_period < slow_period")
+        return _result_frame(np.empty((len(df), 0)), [], names, df.index)
+
+    close = df['close']
+    emas = {span: close.ewm(span=span, adjust=False).mean().to_numpy()
+            for span in _unique([p for pair in pairs for p in pair])}
+    diffs = pd.DataFrame(np.column_stack([emas[fast] - emas[slow] for fast, slow in pairs]))
+
+    # Columns are laid out by (fast, slow) pair, then signal, then DIFF/DEA/BAR
+    values = np.empty((len(df), len(pairs) * len(signal_periods) * 3))
+    blocks = values.reshape(len(df), len(pairs), len(signal_periods), 3)
+    diff_values = diffs.to_numpy()
+    for s, signal in enumerate(signal_periods):
+        deas = diffs.ewm(span=signal, adjust=False).mean().to_numpy()
+        blocks[:, :, s, 0] = diff_values
+        blocks[:, :, s, 1] = deas
+        np.subtract(diff_values, deas, out=blocks[:, :, s, 2])
+
+    keys = [(fast, slow, signal, field) for fast, slow in pairs for signal in signal_periods
+            for field in ('DIFF', 'DEA', 'BAR')]
+    return _result_frame(values, keys, names, df.index)
+
+def sweep_boll(df: pd.DataFrame, periods=20, std_multipliers=2.0) -> pd.DataFrame:
+    """
+    Calculate BOLL for every combination of period and band width.
+
+    The rolling mean and standard deviation are computed once per distinct
+    period; each std_multiplier only costs one multiply-add on top.
+
+    Args:
+        df: DataFrame with stock data containing 'close' column
+        periods: Moving average period or iterable of periods
+        std_multipliers: Band width multiplier or iterable of multipliers
+
+    Returns:
+        DataFrame indexed like df with columns (period, std_multiplier, field),
+        where field is MIDDLE, UPPER or LOWER as in calculate_boll()
+    """
+    periods, std_multipliers = _unique(periods), _unique(std_multipliers)
+    values = np.empty((len(df), len(periods) * len(std_multipliers) * 3))
+    blocks = values.reshape(len(df), len(periods), len(std_multipliers), 3)
+
+    close = df['close'].to_numpy(dtype='float64')
+    for p, period in enumerate(periods):
+        middle, std = rolling_mean_std(close, period)
+        for m, multiplier in enumerate(std_multipliers):
+            blocks[:, p, m, 0] = middle
+            blocks[:, p, m, 1] = middle + std * multiplier
+            blocks[:, p, m, 2] = middle - std * multiplier
+
+    keys = [(period, multiplier, field) for period in periods for multiplier in std_multipliers
+            for field in ('MIDDLE', 'UPPER', 'LOWER')]
+    return _result_frame(values, keys, ['period', 'std_multiplier'], df.index)
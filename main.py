@@ -15,10 +15,38 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from command.cli import fetch_stock_data_command
 
+def resolve_symbols(symbol=None):
+    """Return [symbol] if given, otherwise the symbols from the config file"""
+    if symbol:
+        return [symbol]
+    
+    # Load symbols from config
+    from config.reader import load_symbols_config, get_symbols
+    symbols_config = load_symbols_config()
+    if symbols_config:
+        return get_symbols(symbols_config)
+    return []
+
+def resolve_time_levels(time_level=None):
+    """Return [time_level] if given, otherwise the time levels from the config file"""
+    if time_level:
+        return [time_level]
+    
+    # Load time levels from config
+    from config.reader import load_factors_config, get_minute_levels
+    factors_config = load_factors_config()
+    if not factors_config:
+        return []
+    time_levels = get_minute_levels(factors_config)
+    # Add day level if it exists in config
+    if '1_day' not in time_levels:
+        time_levels.append('1_day')
+    return time_levels
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='Caesar Quantitative Analysis System')
-    parser.add_argument('--mode', choices=['train', 'backtest', 'serve', 'fetch', 'calculate'], 
+    parser.add_argument('--mode', choices=['train', 'backtest', 'serve', 'fetch', 'calculate', 'render', 'migrate'], 
                         default='train', help='运行模式')
     
     # Parse known args to get the mode first
@@ -30,6 +58,14 @@ def main():
         fetch_parser.add_argument('--symbol', required=False, help='Stock symbol to fetch data for (optional, fetches all symbols if not provided)')
         fetch_parser.add_argument('--api-key', required=True, help='Alpha Vantage API key')
         fetch_parser.add_argument('--output', default='./output', help='Output directory for CSV files')
+        fetch_parser.add_argument('--pool-size', type=int, default=10, help='Number of keep-alive HTTP connections kept in the pool')
+        fetch_parser.add_argument('--store-format', choices=['csv', 'parquet', 'feather', 'npy'], default='csv', help='Bar store file format')
+        fetch_parser.add_argument('--incremental', action='store_true', help='Only fetch and append bars newer than the last stored row')
+        fetch_parser.add_argument('--async', dest='use_async', action='store_true', help='Fetch all (symbol, interval) pairs concurrently with aiohttp')
+        fetch_parser.add_argument('--concurrency', type=int, default=10, help='Maximum number of requests in flight in async mode')
+        fetch_parser.add_argument('--requests-per-minute', type=float, default=5, help='API rate budget in requests per minute')
+        fetch_parser.add_argument('--burst', type=int, default=1, help='Number of requests that may be issued back to back before rate limiting')
+        fetch_parser.add_argument('--rate-lock-file', required=False, help='Lock file used to share the rate budget across processes')
         
         # Parse only the arguments after --mode fetch
         fetch_args, _ = fetch_parser.parse_known_args(remaining)
@@ -39,139 +75,127 @@ def main():
             print("Error: --api-key is required for fetch mode")
             sys.exit(1)
         
+        # Every API client in this process draws from the same rate budget
+        from client.rate_limiter import configure_rate_limiter
+        configure_rate_limiter(fetch_args.requests_per_minute, fetch_args.burst, fetch_args.rate_lock_file)
+        
         # Call the appropriate fetch function based on whether symbol is provided
-        if fetch_args.symbol:
+        if fetch_args.use_async:
+            from data.fetcher import fetch_all_stocks_data_async
+            symbols = [fetch_args.symbol] if fetch_args.symbol else None
+            fetch_all_stocks_data_async(fetch_args.api_key, fetch_args.output, symbols,
+                                        fetch_args.concurrency, fetch_args.incremental, fetch_args.store_format)
+        elif fetch_args.symbol:
             from data.fetcher import fetch_stock_data
-            fetch_stock_data(fetch_args.symbol, fetch_args.api_key, fetch_args.output)
+            fetch_stock_data(fetch_args.symbol, fetch_args.api_key, fetch_args.output,
+                             incremental=fetch_args.incremental, store_format=fetch_args.store_format)
         else:
             from data.fetcher import fetch_all_stocks_data
-            fetch_all_stocks_data(fetch_args.api_key, fetch_args.output)
+            fetch_all_stocks_data(fetch_args.api_key, fetch_args.output, fetch_args.pool_size,
+                                  fetch_args.incremental, fetch_args.store_format)
     elif args.mode == 'calculate':
         # Parse calculate-specific arguments
         calculate_parser = argparse.ArgumentParser()
-        calculate_parser.add_argument('--indicator', required=True, choices=['macd', 'boll', 'rsi'], help='Indicator to calculate')
+        calculate_parser.add_argument('--indicator', required=True, help="Indicator to calculate: a registered name (macd, boll, rsi), a comma separated list or 'all'")
+        calculate_parser.add_argument('--param', action='append', default=[], help="Indicator parameter override as indicator.name=value, e.g. rsi.method=wilder (repeatable)")
         calculate_parser.add_argument('--symbol', required=False, help='Stock symbol to calculate indicator for (optional, calculates for all symbols if not provided)')
         calculate_parser.add_argument('--time-level', required=False, help='Time level to calculate indicator for (optional, calculates for all time levels if not provided)')
         calculate_parser.add_argument('--data-dir', default='./output', help='Directory containing stock data CSV files')
         calculate_parser.add_argument('--output-dir', default='./output', help='Base output directory for results')
+        calculate_parser.add_argument('--workers', type=int, default=1, help='Number of worker processes for (symbol, time level) tasks')
+        calculate_parser.add_argument('--no-plot', action='store_true', help='Only calculate and save indicator CSVs; render charts later with --mode render')
+        calculate_parser.add_argument('--force', action='store_true', help='Recalculate indicators even if their outputs are up to date')
         
         # Parse only the arguments after --mode calculate
         calculate_args, _ = calculate_parser.parse_known_args(remaining)
         
-        # Import and call the appropriate calculation function
-        if calculate_args.indicator == 'macd':
-            from indicators.macd import calculate_and_save_macd
-            from config.reader import load_symbols_config, get_symbols
-            
-            # Get symbols to calculate for
-            if calculate_args.symbol:
-                symbols = [calculate_args.symbol]
-            else:
-                # Load symbols from config
-                symbols_config = load_symbols_config()
-                if symbols_config:
-                    symbols = get_symbols(symbols_config)
-                else:
-                    symbols = []
-            
-            # Get time levels to calculate for
-            if calculate_args.time_level:
-                time_levels = [calculate_args.time_level]
-            else:
-                # Load time levels from config
-                from config.reader import load_factors_config, get_minute_levels
-                factors_config = load_factors_config()
-                if factors_config:
-                    time_levels = get_minute_levels(factors_config)
-                    # Add day level if it exists in config
-                    if '1_day' not in time_levels:
-                        time_levels.append('1_day')
-                else:
-                    time_levels = []
-            
-            # Calculate MACD for each symbol and time level
-            for symbol in symbols:
-                for time_level in time_levels:
-                    try:
-                        calculate_and_save_macd(symbol, time_level, calculate_args.data_dir, calculate_args.output_dir)
-                    except Exception as e:
-                        print(f"Error calculating MACD for {symbol} {time_level}: {str(e)}")
-        elif calculate_args.indicator == 'boll':
-            from indicators.boll import calculate_and_save_boll
-            from config.reader import load_symbols_config, get_symbols
-            
-            # Get symbols to calculate for
-            if calculate_args.symbol:
-                symbols = [calculate_args.symbol]
-            else:
-                # Load symbols from config
-                symbols_config = load_symbols_config()
-                if symbols_config:
-                    symbols = get_symbols(symbols_config)
-                else:
-                    symbols = []
-            
-            # Get time levels to calculate for
-            if calculate_args.time_level:
-                time_levels = [calculate_args.time_level]
-            else:
-                # Load time levels from config
-                from config.reader import load_factors_config, get_minute_levels
-                factors_config = load_factors_config()
-                if factors_config:
-                    time_levels = get_minute_levels(factors_config)
-                    # Add day level if it exists in config
-                    if '1_day' not in time_levels:
-                        time_levels.append('1_day')
-                else:
-                    time_levels = []
-            
-            # Calculate BOLL for each symbol and time level
-            for symbol in symbols:
-                for time_level in time_levels:
-                    try:
-                        calculate_and_save_boll(symbol, time_level, calculate_args.data_dir, calculate_args.output_dir)
-                    except Exception as e:
-                        print(f"Error calculating BOLL for {symbol} {time_level}: {str(e)}")
-        elif calculate_args.indicator == 'rsi':
-            from indicators.rsi import calculate_and_save_rsi
-            from config.reader import load_symbols_config, get_symbols
-            
-            # Get symbols to calculate for
-            if calculate_args.symbol:
-                symbols = [calculate_args.symbol]
-            else:
-                # Load symbols from config
-                symbols_config = load_symbols_config()
-                if symbols_config:
-                    symbols = get_symbols(symbols_config)
-                else:
-                    symbols = []
-            
-            # Get time levels to calculate for
-            if calculate_args.time_level:
-                time_levels = [calculate_args.time_level]
-            else:
-                # Load time levels from config
-                from config.reader import load_factors_config, get_minute_levels
-                factors_config = load_factors_config()
-                if factors_config:
-                    time_levels = get_minute_levels(factors_config)
-                    # Add day level if it exists in config
-                    if '1_day' not in time_levels:
-                        time_levels.append('1_day')
-                else:
-                    time_levels = []
-            
-            # Calculate RSI for each symbol and time level
-            for symbol in symbols:
-                for time_level in time_levels:
-                    try:
-                        calculate_and_save_rsi(symbol, time_level, calculate_args.data_dir, calculate_args.output_dir)
-                    except Exception as e:
-                        print(f"Error calculating RSI for {symbol} {time_level}: {str(e)}")
+        from indicators.pipeline import parse_indicators, parse_params, run_calculate
+        
+        try:
+            indicators = parse_indicators(calculate_args.indicator)
+            params = parse_params(calculate_args.param)
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            sys.exit(1)
+        
+        symbols = resolve_symbols(calculate_args.symbol)
+        time_levels = resolve_time_levels(calculate_args.time_level)
+        
+        # Load each symbol and time level once and calculate every requested indicator on it
+        run_calculate(symbols, time_levels, indicators, calculate_args.data_dir,
+                      calculate_args.output_dir, calculate_args.workers, plot=not calculate_args.no_plot, params=params,
+                      force=calculate_args.force)
+    elif args.mode == 'render':
+        # Parse render-specific arguments
+        render_parser = argparse.ArgumentParser()
+        render_parser.add_argument('--indicator', default='all', help="Indicator charts to render: a registered name (macd, boll, rsi), a comma separated list or 'all'")
+        render_parser.add_argument('--symbol', required=False, help='Stock symbol to render charts for (optional, renders all symbols if not provided)')
+        render_parser.add_argument('--time-level', required=False, help='Time level to render charts for (optional, renders all time levels if not provided)')
+        render_parser.add_argument('--data-dir', default='./output', help='Directory containing stock data files')
+        render_parser.add_argument('--output-dir', default='./output', help='Base output directory holding calculated indicators')
+        render_parser.add_argument('--workers', type=int, default=1, help='Number of worker processes for (symbol, time level) tasks')
+        
+        # Parse only the arguments after --mode render
+        render_args, _ = render_parser.parse_known_args(remaining)
+        
+        from indicators.pipeline import parse_indicators, run_render
+        
+        try:
+            indicators = parse_indicators(render_args.indicator)
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            sys.exit(1)
+        
+        # Render charts from previously calculated indicator CSVs
+        run_render(resolve_symbols(render_args.symbol), resolve_time_levels(render_args.time_level), indicators,
+                   render_args.data_dir, render_args.output_dir, render_args.workers)
+    elif args.mode == 'migrate':
+        # Parse migrate-specific arguments
+        migrate_parser = argparse.ArgumentParser()
+        migrate_parser.add_argument('--data-dir', default='./output', help='Directory containing stock data CSV files')
+        migrate_parser.add_argument('--format', choices=['parquet', 'feather', 'npy'], default='parquet', help='Target bar store format (npy: memory-mapped column files)')
+        migrate_parser.add_argument('--price-dtype', choices=['float32', 'float64'], default='float64', help='Storage dtype for OHLC prices')
+        migrate_parser.add_argument('--remove-csv', action='store_true', help='Delete each source CSV after it has been converted')
+        
+        # Parse only the arguments after --mode migrate
+        migrate_args, _ = migrate_parser.parse_known_args(remaining)
+        
+        from data.bar_store import migrate_tree
+        converted = migrate_tree(migrate_args.data_dir, migrate_args.format, migrate_args.price_dtype, migrate_args.remove_csv)
+        print(f"Converted {converted} bar files to {migrate_args.format}")
+    elif args.mode == 'serve':
+        # Parse serve-specific arguments
+        serve_parser = argparse.ArgumentParser()
+        serve_parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+        serve_parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+        serve_parser.add_argument('--data-dir', default='./output', help='Directory containing stock data files')
+        serve_parser.add_argument('--cache-mb', type=int, default=256, help='In-process frame cache budget in megabytes')
+        serve_parser.add_argument('--cache-dir', required=False, help='Directory for the on-disk frame cache (optional)')
+        serve_parser.add_argument('--redis-url', required=False, help='Redis URL of a frame cache shared between servers (optional)')
+        serve_parser.add_argument('--redis-ttl', type=int, required=False, help='Expiry of Redis cache entries in seconds')
+        serve_parser.add_argument('--async', dest='use_async', action='store_true', help='Serve on an aiohttp event loop with computation in a worker pool')
+        serve_parser.add_argument('--workers', type=int, default=4, help='Compute pool size in async mode')
+        serve_parser.add_argument('--executor', choices=['thread', 'process'], default='thread', help='Compute pool type in async mode')
+        
+        # Parse only the arguments after --mode serve
+        serve_args, _ = serve_parser.parse_known_args(remaining)
+        
+        options = {
+            'data_dir': serve_args.data_dir,
+            'cache_mb': serve_args.cache_mb,
+            'cache_dir': serve_args.cache_dir,
+            'redis_url': serve_args.redis_url,
+            'redis_ttl': serve_args.redis_ttl
+        }
+        if serve_args.use_async:
+            from api.async_server import run_async_server
+            run_async_server(serve_args.host, serve_args.port, workers=serve_args.workers,
+                             executor=serve_args.executor, **options)
+        else:
+            from api.server import run_server
+            run_server(serve_args.host, serve_args.port, **options)
     else:
-        # Handle other modes (train, backtest, serve)
+        # Handle other modes (train, backtest)
         # For now, we'll just print a message as CLI class is not defined
         print(f"Mode '{args.mode}' is not yet implemented")
 
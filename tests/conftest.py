@@ -0,0 +1,28 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def make_bars(rows: int, seed: int = 0, start: str = '2024-01-02', freq: str = 'D') -> pd.DataFrame:
+    """Random-walk OHLCV bars indexed by timestamp"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    index = pd.date_range(start, periods=rows, freq=freq).astype('datetime64[ns]')
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.2, rows),
+        'high': close + 1.0,
+        'low': close - 1.0,
+        'close': close,
+        'volume': rng.integers(1000, 5000, rows)
+    }, index=index)
+
+
+@pytest.fixture
+def bars():
+    return make_bars(300)
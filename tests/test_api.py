@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+from conftest import make_bars
+from api.server import create_app
+from cache.manager import CacheManager
+from data.bar_store import bar_file, write_bars
+
+
+@pytest.fixture
+def client(tmp_path):
+    data_dir = str(tmp_path)
+    os.makedirs(os.path.join(data_dir, 'AAPL'))
+    write_bars(make_bars(120, start='2025-07-29 09:30', freq='min'), bar_file(data_dir, 'AAPL', '1_minute'))
+    return create_app(data_dir=data_dir, cache=CacheManager()).test_client()
+
+
+@pytest.mark.parametrize('path', ['/bars/AAPL/1_minute', '/indicators/rsi/AAPL/1_minute'])
+def test_timezone_aware_range_is_converted_to_bar_time(client, path):
+    # 13:35Z is 09:35 in New York (EDT) on this date
+    response = client.get(f'{path}?start=2025-07-29T13:35:00.000Z&end=2025-07-29T09:39:00-04:00')
+    assert response.status_code == 200
+    body = json.loads(response.data)
+    assert body['index'][0] == '2025-07-29T09:35:00'
+    assert body['index'][-1] == '2025-07-29T09:39:00'
+
+
+@pytest.mark.parametrize('path', ['/bars/AAPL/1_minute', '/indicators/rsi/AAPL/1_minute'])
+@pytest.mark.parametrize('value', ['yesterday', 'NaT'])
+def test_invalid_range_is_a_bad_request(client, path, value):
+    response = client.get(f'{path}?start={value}')
+    assert response.status_code == 400
+    assert 'Invalid timestamp' in response.get_json()['error']
+
+
+BATCH_ITEMS = [
+    {'symbol': 'AAPL', 'level': '1_minute', 'indicator': 'rsi', 'start': '2025-07-29T13:35:00.000Z', 'end': '2025-07-29T09:36:00'},
+    {'symbol': 'AAPL', 'level': '1_minute', 'indicator': 'macd', 'start': 'NaT'},
+    {'symbol': 'MSFT', 'level': '1_minute', 'indicator': 'rsi'},
+    ['AAPL', '1_minute', 'boll', {'period': 10}]
+]
+
+
+def _check_batch_lines(body):
+    lines = {line['index']: line for line in map(json.loads, body.splitlines())}
+    assert sorted(lines) == [0, 1, 2, 3]
+    assert lines[0]['status'] == 200
+    assert lines[0]['data']['index'] == ['2025-07-29T09:35:00', '2025-07-29T09:36:00']
+    assert lines[1]['status'] == 400 and 'Invalid timestamp' in lines[1]['error']
+    assert lines[2]['status'] == 404
+    return lines
+
+
+def test_batch_streams_a_line_per_item(client):
+    response = client.post('/indicators/batch', json={'items': BATCH_ITEMS})
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    assert _check_batch_lines(response.data)[3]['status'] == 200
+
+
+def test_batch_item_failure_becomes_an_error_line(client, monkeypatch):
+    import api.batch
+    encode_json = api.batch.encode_json
+
+    def encode_or_fail(frame):
+        if 'MIDDLE' in frame.columns:
+            raise TypeError('boom')
+        return encode_json(frame)
+
+    monkeypatch.setattr(api.batch, 'encode_json', encode_or_fail)
+    response = client.post('/indicators/batch', json=BATCH_ITEMS)
+    assert _check_batch_lines(response.data)[3]['status'] == 500
+
+
+def test_async_batch(tmp_path):
+    aiohttp_test_utils = pytest.importorskip('aiohttp.test_utils')
+    import asyncio
+    from api.async_server import create_async_app
+
+    os.makedirs(os.path.join(tmp_path, 'AAPL'))
+    write_bars(make_bars(120, start='2025-07-29 09:30', freq='min'), bar_file(str(tmp_path), 'AAPL', '1_minute'))
+
+    async def run():
+        server = aiohttp_test_utils.TestServer(create_async_app(data_dir=str(tmp_path), workers=2))
+        async with aiohttp_test_utils.TestClient(server) as async_client:
+            response = await async_client.post('/indicators/batch', json=BATCH_ITEMS)
+            assert response.status == 200
+            return await response.read()
+
+    assert _check_batch_lines(asyncio.run(run()))[3]['status'] == 200
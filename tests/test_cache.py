@@ -0,0 +1,226 @@
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache.codec import decode_frame, encode_frame
+from cache.manager import CacheManager, DiskTier, MemoryTier, RedisTier, frame_nbytes
+from conftest import make_bars
+from data.bar_store import append_bars, bar_file, write_bars
+from indicators import get_indicator
+from indicators.sweep import sweep_boll
+
+pytest.importorskip('fakeredis')
+
+
+def _frame(rows: int = 10, seed: int = 0) -> pd.DataFrame:
+    return make_bars(rows, seed)[['close']]
+
+
+@pytest.fixture
+def redis_url():
+    # Clients for the same host share one in-process server; a fresh host isolates each test
+    return f'fakeredis://{uuid.uuid4().hex}:6379/0'
+
+
+def test_codec_round_trips_bars():
+    df = make_bars(50)
+    df['flag'] = df['close'] > 100
+    df['stamp'] = df.index
+    decoded = decode_frame(encode_frame(df))
+    pd.testing.assert_frame_equal(decoded, df, check_freq=False)
+
+
+def test_codec_round_trips_sweep_columns():
+    df = sweep_boll(make_bars(60), periods=[10, 20], std_multipliers=[1.5, 2.0])
+    assert df.columns.nlevels == 3
+    decoded = decode_frame(encode_frame(df))
+    pd.testing.assert_frame_equal(decoded, df, check_freq=False)
+    assert list(decoded.columns.names) == list(df.columns.names)
+
+
+def test_codec_round_trips_empty_frame():
+    df = make_bars(0)
+    decoded = decode_frame(encode_frame(df))
+    assert decoded.empty and list(decoded.columns) == list(df.columns)
+    assert decoded.index.dtype == df.index.dtype
+
+
+def test_codec_stores_little_endian():
+    df = pd.DataFrame({'value': np.arange(5, dtype='>f8')}, index=pd.RangeIndex(5))
+    decoded = decode_frame(encode_frame(df))
+    np.testing.assert_array_equal(decoded['value'].to_numpy(), np.arange(5.0))
+    assert decoded['value'].dtype.byteorder in '<='
+
+
+def test_codec_rejects_unsupported_frames():
+    df = make_bars(5)
+    with pytest.raises(ValueError, match='Timezone-aware'):
+        encode_frame(df.tz_localize('UTC'))
+    with pytest.raises(ValueError, match='Timezone-aware'):
+        encode_frame(df.assign(stamp=df.index.tz_localize('UTC')))
+    with pytest.raises(ValueError, match='Unsupported dtype'):
+        encode_frame(df.assign(note='x'))
+    with pytest.raises(ValueError, match='Not a cached frame'):
+        decode_frame(b'not a blob')
+
+
+def test_memory_tier_evicts_least_recently_used():
+    frames = {key: _frame(seed=i) for i, key in enumerate('abc')}
+    size = frame_nbytes(frames['a'])
+    tier = MemoryTier(max_bytes=2 * size)
+    tier.put('a', frames['a'])
+    tier.put('b', frames['b'])
+    assert tier.get('a') is frames['a']  # 'b' is now the least recently used
+    tier.put('c', frames['c'])
+    assert tier.get('b') is None
+    assert tier.get('a') is frames['a'] and tier.get('c') is frames['c']
+    assert tier.nbytes == 2 * size
+
+    # Replacing a key does not count it twice
+    tier.put('c', frames['c'])
+    assert tier.nbytes == 2 * size
+
+
+def test_memory_tier_skips_frames_over_budget():
+    tier = MemoryTier(max_bytes=frame_nbytes(_frame()) - 1)
+    tier.put('a', _frame())
+    assert tier.get('a') is None and tier.nbytes == 0
+
+
+def test_disk_tier_round_trip_and_eviction(tmp_path):
+    tier = DiskTier(str(tmp_path))
+    frame = _frame()
+    tier.put('a', frame)
+    pd.testing.assert_frame_equal(tier.get('a'), frame, check_freq=False)
+    assert tier.get('missing') is None
+
+    blob_size = len(encode_frame(frame))
+    tier = DiskTier(str(tmp_path), max_bytes=2 * blob_size)
+    tier.put('b', frame)
+    # Distinct recency without sleeping: 'a' is older than 'b'
+    for i, key in enumerate('ab'):
+        os.utime(tier._path(key), ns=(i * 10**9, i * 10**9))
+    tier.put('c', frame)
+    assert tier.get('a') is None
+    assert tier.get('b') is not None and tier.get('c') is not None
+
+
+def test_disk_tier_drops_unreadable_files(tmp_path):
+    tier = DiskTier(str(tmp_path))
+    with open(tier._path('a'), 'wb') as file:
+        file.write(b'garbage')
+    assert tier.get('a') is None
+    assert not os.path.exists(tier._path('a'))
+
+
+def test_redis_tier_round_trip_with_ttl(redis_url):
+    tier = RedisTier.from_url(redis_url, ttl=60)
+    frame = _frame()
+    tier.put('a', frame)
+    pd.testing.assert_frame_equal(tier.get('a'), frame, check_freq=False)
+    assert 0 < tier.client.ttl('caesar:a') <= 60
+    # Stored as a codec blob, not JSON
+    assert tier.client.get('caesar:a').startswith(b'CQF1')
+
+    persistent = RedisTier.from_url(redis_url)
+    persistent.put('b', frame)
+    assert persistent.client.ttl('caesar:b') == -1
+
+
+def test_redis_tier_get_many_and_put_many(redis_url):
+    tier = RedisTier.from_url(redis_url, ttl=60)
+    frames = {key: _frame(seed=i) for i, key in enumerate('abc')}
+    tier.put_many(frames)
+    assert all(0 < tier.client.ttl(f'caesar:{key}') <= 60 for key in frames)
+
+    found = tier.get_many(['c', 'missing', 'a'])
+    assert found[1] is None
+    pd.testing.assert_frame_equal(found[0], frames['c'], check_freq=False)
+    pd.testing.assert_frame_equal(found[2], frames['a'], check_freq=False)
+    assert tier.get_many([]) == []
+
+
+def test_redis_tier_multi_key_calls_take_one_round_trip(redis_url, monkeypatch):
+    tier = RedisTier.from_url(redis_url)
+    calls = []
+    for method in ('get', 'set'):
+        monkeypatch.setattr(tier.client, method, lambda *args, **kwargs: calls.append(method))
+    tier.put_many({key: _frame() for key in 'abc'})
+    tier.get_many(list('abc'))
+    assert calls == []
+
+
+def test_redis_clear_keeps_other_prefixes(redis_url):
+    tier = RedisTier.from_url(redis_url)
+    other = RedisTier.from_url(redis_url, prefix='other:')
+    tier.put('a', _frame())
+    other.put('a', _frame())
+    tier.clear()
+    assert tier.get('a') is None and other.get('a') is not None
+
+
+def test_manager_promotes_hits_to_faster_tiers(tmp_path, redis_url):
+    manager = CacheManager(disk_dir=str(tmp_path / 'disk'), redis_url=redis_url)
+    memory, disk, redis_tier = manager.tiers
+    frame = _frame()
+    redis_tier.put('a', frame)
+
+    assert manager.get('a') is not None
+    assert memory.get('a') is not None and disk.get('a') is not None
+    assert manager.get('a') is memory.get('a')
+    assert manager.stats == {'memory': 1, 'disk': 0, 'redis': 1, 'misses': 0}
+
+
+def test_manager_get_many_asks_each_tier_for_missing_keys(tmp_path, redis_url, monkeypatch):
+    manager = CacheManager(disk_dir=str(tmp_path / 'disk'), redis_url=redis_url)
+    memory, disk, redis_tier = manager.tiers
+    memory.put('a', _frame(seed=1))
+    disk.put('b', _frame(seed=2))
+    redis_tier.put('c', _frame(seed=3))
+
+    requested = []
+    original = redis_tier.get_many
+    monkeypatch.setattr(redis_tier, 'get_many', lambda keys: requested.append(keys) or original(keys))
+    found = manager.get_many(['a', 'b', 'c', 'd', 'a'])
+    assert sorted(found) == ['a', 'b', 'c']
+    assert requested == [['c', 'd']]
+    assert manager.stats == {'memory': 1, 'disk': 1, 'redis': 1, 'misses': 1}
+    assert memory.get('c') is not None and disk.get('c') is not None
+
+
+def test_manager_skips_failing_shared_tiers(tmp_path):
+    class BrokenClient:
+        def __getattr__(self, name):
+            def fail(*args, **kwargs):
+                raise ConnectionError('redis is down')
+            return fail
+
+    manager = CacheManager(redis_client=BrokenClient())
+    frame = _frame()
+    assert manager.get_or_compute('a', lambda: frame) is frame
+    manager.put_many({'b': frame})
+    assert manager.get_many(['a', 'b', 'c']).keys() == {'a', 'b'}
+
+
+def test_manager_keys_follow_bar_file_version(tmp_path):
+    data_dir = str(tmp_path)
+    os.makedirs(os.path.join(data_dir, 'AAPL'))
+    path = bar_file(data_dir, 'AAPL', '1_day', 'csv')
+    bars = make_bars(120)
+    write_bars(bars.iloc[:100], path)
+
+    manager = CacheManager()
+    spec = get_indicator('rsi')
+    first = manager.indicator('rsi', 'AAPL', '1_day', data_dir)
+    assert manager.indicator('rsi', 'AAPL', '1_day', data_dir) is first
+    assert manager.indicator('rsi', 'AAPL', '1_day', data_dir, {'period': 10}) is not first
+
+    append_bars(bars, path, bars.index[99])
+    updated = manager.indicator('rsi', 'AAPL', '1_day', data_dir)
+    assert len(updated) == 120
+    expected = spec.compute(bars[list(spec.inputs)], spec.resolve_params())
+    np.testing.assert_allclose(updated.to_numpy(), expected.to_numpy(), equal_nan=True)
+    assert manager.indicator('rsi', 'MISSING', '1_day', data_dir) is None
@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data.column_store as column_store
+from conftest import make_bars
+from data.bar_store import read_bars, read_last_timestamp, to_typed_frame, write_bars
+from data.column_store import HEADER_FILE, read_columns, read_header, write_columns
+
+
+def assert_bars_equal(mapped, expected):
+    # Copy so memory-mapped columns compare as plain arrays
+    pd.testing.assert_frame_equal(mapped.copy(), expected, check_freq=False)
+
+
+def test_round_trip_and_superseded_versions_removed(tmp_path):
+    path = str(tmp_path / 'AAPL_1_day.columns')
+    first, second = make_bars(50, seed=1), make_bars(80, seed=2)
+    write_bars(first, path)
+    old = read_bars(path)
+    write_bars(second, path)
+
+    assert_bars_equal(read_bars(path), second)
+    assert read_last_timestamp(path) == second.index[-1]
+    # A frame mapped before the rewrite still sees its own version in full
+    assert_bars_equal(old, first)
+    assert sorted(os.listdir(path)) == sorted([HEADER_FILE, read_header(path)['data']])
+
+
+def test_reader_retries_when_its_version_is_replaced(tmp_path, monkeypatch):
+    path = str(tmp_path / 'AAPL_1_day.columns')
+    write_bars(make_bars(50, seed=1), path)
+    replacement = make_bars(60, seed=2)
+    real_read_header = column_store.read_header
+    calls = []
+
+    def read_header_then_rewrite(column_dir):
+        header = real_read_header(column_dir)
+        if not calls:
+            # A writer publishes a new version right after this reader read the header
+            write_columns(to_typed_frame(replacement), column_dir)
+        calls.append(header)
+        return header
+
+    monkeypatch.setattr(column_store, 'read_header', read_header_then_rewrite)
+    assert_bars_equal(read_columns(path), replacement)
+    assert len(calls) == 2
+
+
+def test_length_mismatch_is_an_error(tmp_path):
+    path = str(tmp_path / 'AAPL_1_day.columns')
+    write_bars(make_bars(50), path)
+    header = read_header(path)
+    np.save(os.path.join(path, header['data'], 'close.npy'), np.zeros(49))
+    with pytest.raises(ValueError, match='49 rows'):
+        read_columns(path)
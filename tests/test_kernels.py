@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_bars
+from indicators.boll import calculate_boll
+from indicators.kernels import rolling_mean_std
+
+WINDOW = 20
+
+
+def _assert_matches_pandas(values, window, rtol=1e-9):
+    mean, std = rolling_mean_std(values, window)
+    frame = pd.DataFrame(values)
+    rolling = frame.rolling(window)
+    np.testing.assert_allclose(mean.reshape(frame.shape), rolling.mean().to_numpy(), rtol=rtol, atol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(std.reshape(frame.shape), rolling.std().to_numpy(), rtol=rtol, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize('n', [WINDOW - 1, WINDOW, WINDOW + 1, 2 * WINDOW - 1])
+def test_short_series(n):
+    values = np.random.default_rng(n).normal(100, 1, n)
+    _assert_matches_pandas(values, WINDOW)
+    _assert_matches_pandas(np.column_stack([values, values[::-1]]), WINDOW)
+
+
+@pytest.mark.parametrize('n', [WINDOW - 5, WINDOW - 1])
+def test_boll_on_fewer_bars_than_period_is_nan(n):
+    result = calculate_boll(make_bars(n), period=WINDOW)
+    assert len(result) == n and result.isna().all().all()
+
+
+def test_with_gaps_and_block_crossings():
+    values = np.random.default_rng(1).normal(50, 2, (10000, 2))
+    values[:7, 1] = np.nan
+    values[5000, 0] = np.nan
+    _assert_matches_pandas(values, WINDOW)
+
+
+def test_drifting_series_precision():
+    # A steady trend with little noise: x^2 sums over uncentred data lose
+    # the small window variance to cancellation
+    n = 200000
+    values = 100 + np.arange(n) * 0.5 + np.random.default_rng(2).normal(0, 0.01, n)
+    windows = np.lib.stride_tricks.sliding_window_view(values, WINDOW)
+    mean, std = rolling_mean_std(values, WINDOW)
+    np.testing.assert_allclose(mean[WINDOW - 1:], windows.mean(axis=1), rtol=1e-12)
+    np.testing.assert_allclose(std[WINDOW - 1:], windows.std(axis=1, ddof=1), rtol=1e-7)
+
+
+def test_window_of_one_has_nan_std():
+    values = np.random.default_rng(3).normal(100, 1, (50, 2))
+    mean, std = rolling_mean_std(values, 1)
+    np.testing.assert_array_equal(mean, values)
+    assert np.isnan(std).all()
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from conftest import make_bars
+from data.bar_store import bar_file, find_bar_file, write_bars
+from indicators import get_indicator
+from indicators.manifest import is_up_to_date, read_manifest
+from indicators.pipeline import calculate_and_save_indicators, indicator_csv_file
+from indicators.rsi import calculate_rsi
+
+
+def _bump_mtime(path: str, seconds: int = 10) -> None:
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+
+def test_up_to_date_after_calculation(tmp_path):
+    data_dir = str(tmp_path)
+    os.makedirs(os.path.join(data_dir, 'AAPL'))
+    write_bars(make_bars(200), bar_file(data_dir, 'AAPL', '1_day', 'csv'))
+
+    assert calculate_and_save_indicators('AAPL', '1_day', ['rsi'], data_dir, data_dir, plot=False) == {}
+    csv_filename = indicator_csv_file(data_dir, 'AAPL', 'rsi', '1_day')
+    params = get_indicator('rsi').resolve_params()
+    assert is_up_to_date(csv_filename, get_indicator('rsi'), params, find_bar_file(data_dir, 'AAPL', '1_day'))
+    assert not is_up_to_date(csv_filename, get_indicator('rsi'), params, None)
+
+
+def test_newer_format_supersedes_recorded_bar_file(tmp_path):
+    data_dir = str(tmp_path)
+    os.makedirs(os.path.join(data_dir, 'AAPL'))
+    csv_path = bar_file(data_dir, 'AAPL', '1_day', 'csv')
+    write_bars(make_bars(200, seed=1), csv_path)
+    assert calculate_and_save_indicators('AAPL', '1_day', ['rsi'], data_dir, data_dir, plot=False) == {}
+
+    # A migration or fetch writes a newer Parquet file with different closes
+    parquet_path = bar_file(data_dir, 'AAPL', '1_day', 'parquet')
+    changed = make_bars(200, seed=2)
+    write_bars(changed, parquet_path)
+    _bump_mtime(parquet_path)
+    assert find_bar_file(data_dir, 'AAPL', '1_day') == parquet_path
+
+    csv_filename = indicator_csv_file(data_dir, 'AAPL', 'rsi', '1_day')
+    params = get_indicator('rsi').resolve_params()
+    assert not is_up_to_date(csv_filename, get_indicator('rsi'), params, parquet_path)
+
+    assert calculate_and_save_indicators('AAPL', '1_day', ['rsi'], data_dir, data_dir, plot=False) == {}
+    assert read_manifest(csv_filename)['input']['path'] == os.path.abspath(parquet_path)
+    saved = pd.read_csv(csv_filename, index_col=0)
+    np.testing.assert_allclose(saved['RSI'].to_numpy(), calculate_rsi(changed)['RSI'].to_numpy(), equal_nan=True)
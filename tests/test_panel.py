@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import make_bars
+from data.bar_store import bar_file, write_bars
+from indicators.boll import calculate_boll
+from indicators.macd import calculate_macd
+from indicators.panel import calculate_boll_panel, calculate_macd_panel, calculate_rsi_panel, load_panel
+from indicators.rsi import calculate_rsi
+
+SINGLE = {
+    'macd': (calculate_macd_panel, calculate_macd, {}),
+    'boll': (calculate_boll_panel, calculate_boll, {}),
+    'rsi': (calculate_rsi_panel, calculate_rsi, {'method': 'sma'}),
+    'rsi_wilder': (calculate_rsi_panel, calculate_rsi, {'method': 'wilder'})
+}
+
+
+@pytest.fixture
+def gapped_panel(tmp_path):
+    """Three symbols on different calendars: full, randomly missing bars, listed late"""
+    rng = np.random.default_rng(0)
+    full = make_bars(600, seed=1, freq='min')
+    symbols = {
+        'AAA': full,
+        'BBB': make_bars(600, seed=2, freq='min')[rng.random(600) > 0.1],
+        'CCC': make_bars(600, seed=3, freq='min').iloc[250:]
+    }
+    for symbol, bars in symbols.items():
+        os.makedirs(tmp_path / symbol)
+        write_bars(bars, bar_file(str(tmp_path), symbol, '1_minute'))
+    return symbols, load_panel(list(symbols), '1_minute', str(tmp_path))
+
+
+@pytest.mark.parametrize('name', list(SINGLE))
+def test_panel_matches_single_symbol_on_gapped_calendars(gapped_panel, name):
+    symbols, panel = gapped_panel
+    panel_func, single_func, params = SINGLE[name]
+    # The outer join leaves gaps in the symbols that did not trade every bar
+    assert panel['BBB'].isna().any() and panel['CCC'].isna().any()
+
+    result = panel_func(panel, **params)
+    for symbol, bars in symbols.items():
+        expected = single_func(bars, **params)
+        for field in expected.columns:
+            column = result[(field, symbol)]
+            np.testing.assert_allclose(column.loc[bars.index].to_numpy(), expected[field].to_numpy(),
+                                       rtol=1e-9, atol=1e-9, equal_nan=True)
+            # Timestamps the symbol has no bar for stay empty
+            assert column.drop(bars.index).isna().all()
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators.pipeline as pipeline
+from conftest import make_bars
+from data.bar_store import append_bars, bar_file, read_last_timestamp, write_bars
+from indicators.manifest import read_manifest
+from indicators.pipeline import calculate_and_save_indicators, indicator_csv_file
+
+INDICATORS = ['macd', 'boll', 'rsi']
+
+
+def _calculate(data_dir, output_dir, **kwargs):
+    assert calculate_and_save_indicators('AAPL', '1_day', INDICATORS, data_dir, output_dir, plot=False, **kwargs) == {}
+
+
+def _assert_outputs_match_full_recalculation(data_dir, output_dir, tmp_path):
+    full_dir = str(tmp_path / 'full')
+    _calculate(data_dir, full_dir, force=True)
+    for indicator in INDICATORS:
+        resumed = pd.read_csv(indicator_csv_file(output_dir, 'AAPL', indicator, '1_day'), index_col=0)
+        full = pd.read_csv(indicator_csv_file(full_dir, 'AAPL', indicator, '1_day'), index_col=0)
+        assert list(resumed.index) == list(full.index)
+        np.testing.assert_allclose(resumed.to_numpy(), full.to_numpy(), rtol=1e-7, atol=1e-9, equal_nan=True)
+
+
+def _setup(tmp_path, fmt, rows=300):
+    data_dir = str(tmp_path / 'data')
+    os.makedirs(os.path.join(data_dir, 'AAPL'))
+    path = bar_file(data_dir, 'AAPL', '1_day', fmt)
+    bars = make_bars(rows + 50, seed=7)
+    write_bars(bars.iloc[:rows], path)
+    _calculate(data_dir, data_dir)
+    return data_dir, path, bars
+
+
+def test_csv_append_reads_only_the_tail(tmp_path, monkeypatch):
+    data_dir, path, bars = _setup(tmp_path, 'csv')
+    assert append_bars(bars, path, read_last_timestamp(path)) == 50
+
+    with monkeypatch.context() as patch:
+        patch.setattr(pipeline, 'get_cache_manager', lambda: pytest.fail('full bar history was read'))
+        _calculate(data_dir, data_dir)
+    manifest = read_manifest(indicator_csv_file(data_dir, 'AAPL', 'rsi', '1_day'))
+    assert manifest['rows'] == 350 and manifest['tail_rows'] == pipeline.TAIL_ROWS
+    _assert_outputs_match_full_recalculation(data_dir, data_dir, tmp_path)
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'npy'])
+def test_columnar_append_resumes(tmp_path, fmt):
+    data_dir, path, bars = _setup(tmp_path, fmt)
+    append_bars(bars, path, read_last_timestamp(path))
+    _calculate(data_dir, data_dir)
+    _assert_outputs_match_full_recalculation(data_dir, data_dir, tmp_path)
+
+
+def test_touched_file_appends_nothing(tmp_path):
+    data_dir, path, _ = _setup(tmp_path, 'csv')
+    csv_filename = indicator_csv_file(data_dir, 'AAPL', 'macd', '1_day')
+    before = open(csv_filename).read()
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    _calculate(data_dir, data_dir)
+    assert open(csv_filename).read() == before
+    assert read_manifest(csv_filename)['input']['mtime_ns'] == stat.st_mtime_ns + 10**9
+
+
+def test_rewritten_recent_bar_forces_recalculation(tmp_path):
+    data_dir, path, bars = _setup(tmp_path, 'csv')
+    edited = bars.copy()
+    edited.iloc[295, edited.columns.get_loc('close')] += 5.0
+    write_bars(edited, path)
+    _calculate(data_dir, data_dir)
+    assert read_manifest(indicator_csv_file(data_dir, 'AAPL', 'rsi', '1_day'))['rows'] == 350
+    _assert_outputs_match_full_recalculation(data_dir, data_dir, tmp_path)
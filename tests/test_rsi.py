@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+import indicators.kernels as kernels
+from conftest import make_bars
+from indicators.kernels import ewm_filter
+from indicators.rsi import calculate_rsi
+from indicators.streaming import RSIState
+
+
+@pytest.fixture(params=['lfilter', 'pandas'])
+def filter_backend(request, monkeypatch):
+    """Run a test with scipy's lfilter and again with the pandas fallback"""
+    if request.param == 'lfilter':
+        pytest.importorskip('scipy.signal')
+        assert kernels.lfilter is not None
+    else:
+        monkeypatch.setattr(kernels, 'lfilter', None)
+    return request.param
+
+
+def reference_rsi(close, period: int, method: str) -> np.ndarray:
+    """Textbook RSI recurrences as a plain Python loop"""
+    gains, losses = [0.0], [0.0]
+    for previous, current in zip(close[:-1], close[1:]):
+        delta = current - previous
+        # A change next to a missing close counts as no change
+        gains.append(delta if delta > 0 else 0.0)
+        losses.append(-delta if delta < 0 else 0.0)
+
+    avg_gain = [float('nan')] * len(close)
+    avg_loss = [float('nan')] * len(close)
+    if method == 'wilder':
+        if len(close) > period:
+            avg_gain[period] = sum(gains[1:period + 1]) / period
+            avg_loss[period] = sum(losses[1:period + 1]) / period
+            for t in range(period + 1, len(close)):
+                avg_gain[t] = (avg_gain[t - 1] * (period - 1) + gains[t]) / period
+                avg_loss[t] = (avg_loss[t - 1] * (period - 1) + losses[t]) / period
+    else:
+        alpha = 2.0 / (period + 1)
+        for t in range(1, len(close)):
+            if t == 1:
+                avg_gain[t], avg_loss[t] = gains[t], losses[t]
+            else:
+                avg_gain[t] = (1 - alpha) * avg_gain[t - 1] + alpha * gains[t]
+                avg_loss[t] = (1 - alpha) * avg_loss[t - 1] + alpha * losses[t]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - 100 / (1 + np.array(avg_gain) / np.array(avg_loss))
+
+
+@pytest.mark.parametrize('alpha', [1 / 14, 2 / 15, 1.0])
+def test_ewm_filter_matches_recurrence(filter_backend, alpha):
+    values = np.random.default_rng(0).normal(size=(500, 3))
+    initial = np.array([1.0, -2.0, 0.5])
+    expected = np.empty_like(values)
+    state = initial
+    for t in range(len(values)):
+        state = (1 - alpha) * state + alpha * values[t]
+        expected[t] = state
+
+    np.testing.assert_allclose(ewm_filter(values, alpha, initial=initial), expected, rtol=1e-12, atol=1e-12)
+    # Without an initial state the filter starts at the first row
+    np.testing.assert_allclose(ewm_filter(values[:, 0], alpha)[0], values[0, 0])
+    assert ewm_filter(np.empty((0, 2)), alpha).shape == (0, 2)
+
+
+@pytest.mark.parametrize('method', ['wilder', 'ema'])
+@pytest.mark.parametrize('period', [2, 14])
+def test_smoothed_rsi_matches_reference(filter_backend, method, period):
+    df = make_bars(600, seed=3)
+    expected = reference_rsi(df['close'].tolist(), period, method)
+    result = calculate_rsi(df, period=period, method=method)['RSI'].to_numpy()
+    np.testing.assert_allclose(result, expected, rtol=1e-10, atol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize('method', ['wilder', 'ema'])
+def test_smoothed_rsi_with_leading_nans(filter_backend, method):
+    df = make_bars(300, seed=4)
+    df.iloc[:20, df.columns.get_loc('close')] = np.nan
+    expected = reference_rsi(df['close'].tolist(), 14, method)
+    result = calculate_rsi(df, period=14, method=method)['RSI'].to_numpy()
+    np.testing.assert_allclose(result, expected, rtol=1e-10, atol=1e-10, equal_nan=True)
+    # Missing closes do not leak NaN into the rest of the series
+    assert np.isfinite(result[40:]).all()
+
+
+def test_rsi_short_series_is_all_nan_for_wilder(filter_backend):
+    df = make_bars(10)
+    assert calculate_rsi(df, period=14, method='wilder')['RSI'].isna().all()
+
+
+@pytest.mark.parametrize('method', ['sma', 'wilder', 'ema'])
+@pytest.mark.parametrize('leading_nans', [0, 5])
+def test_rsi_state_matches_batch(method, leading_nans):
+    df = make_bars(400, seed=5)
+    df.iloc[:leading_nans, df.columns.get_loc('close')] = np.nan
+    expected = calculate_rsi(df, period=14, method=method)['RSI'].to_numpy()
+
+    state = RSIState(period=14, method=method)
+    streamed = np.array([state.update(bar)['RSI'] for bar in df[['close']].to_dict('records')])
+    np.testing.assert_allclose(streamed, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    # Resuming from a state built over the first rows gives the same tail
+    resumed = RSIState.from_history(df.iloc[:250], period=14, method=method)
+    tail = np.array([resumed.update(bar)['RSI'] for bar in df.iloc[250:][['close']].to_dict('records')])
+    np.testing.assert_allclose(tail, expected[250:], rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError, match='Unknown RSI method'):
+        calculate_rsi(make_bars(30), method='median')